@@ -1,107 +1,436 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import heapq
+import re
+from contextlib import asynccontextmanager
+from typing import Optional, Union
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import upstream
 # Добавляем новые модели ответа
-from schemas import StandingsResponse
-# Добавляем новую сервисную функцию
-from service import fetch_standings_normalized, get_players_by_competition
+from schemas import StandingsBatchResponse, StandingsResponse
+from changes import sse_message, version_of
+from encoding import cache_control, dumps, encode_batch
+from logs import setup_logging, stop_logging
+from metrics import MetricsMiddleware, registry
+from player_index import SORT_FIELDS, CursorError
+from player_stats import BOARDS, board_key, team_key
+# Данные отдаются из кэша снимков, а не напрямую из upstream
+from snapshots import (
+    LEAGUES,
+    WARMER_ENABLED,
+    cache,
+    changelog,
+    get_match_index,
+    get_player_index,
+    get_player_stats,
+    get_snapshot_entry,
+    hub,
+    resolve_league,
+    store,
+    warmer,
+    watch_store_changes,
+)
+
+
+setup_logging()
+
 
-app = FastAPI(title="Football Data API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Фоновый прогрев лиг живёт столько же, сколько приложение
+    await upstream.start()
+    if WARMER_ENABLED:
+        warmer.start()
+    # Диффы для SSE-подписчиков этого воркера, даже если снимки обновляет другой
+    store_watcher = asyncio.create_task(watch_store_changes())
+    yield
+    store_watcher.cancel()
+    await asyncio.gather(store_watcher, return_exceptions=True)
+    await warmer.stop()
+    await upstream.close()
+    store.close()
+    stop_logging()
+
+
+app = FastAPI(title="Football Data API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["GET"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Snapshot-Version"],
 )
+app.add_middleware(MetricsMiddleware)
 
-# --- Эндпоинты для таблиц лиг ---
+# --- Ответ из заранее закодированного снимка ---
 
-@app.get("/standings", response_model=StandingsResponse)
-def get_premier_league_standings():
-    """Возвращает таблицу Premier League."""
+def parse_league(league: str) -> str:
     try:
-        return fetch_standings_normalized("PL")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+        return resolve_league(league)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-@app.get("/standings/la-liga", response_model=StandingsResponse)
-def get_la_liga_standings():
-    """Возвращает таблицу La Liga."""
-    try:
-        return fetch_standings_normalized("PD")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
 
-@app.get("/standings/bundesliga", response_model=StandingsResponse)
-def get_bundesliga_standings():
-    """Возвращает таблицу Bundesliga."""
+async def snapshot_response(request: Request, kind: str, competition_id: str):
+    """Отдаёт снимок готовыми байтами: без валидации и сериализации на каждый запрос.
+
+    Поддерживает If-None-Match/If-Modified-Since (304) и gzip/brotli по Accept-Encoding.
+    """
     try:
-        return fetch_standings_normalized("BL1")
+        entry = await get_snapshot_entry(kind, competition_id)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
 
-@app.get("/standings/serie-a", response_model=StandingsResponse)
-def get_serie_a_standings():
-    """Возвращает таблицу Serie A."""
+    response = encoded_response(
+        request,
+        cache.encoded(entry),
+        cache_control(entry.fresh_until, entry.stale_until - entry.fresh_until),
+    )
+    # С этой версии клиент может запрашивать /changes?since=...
+    response.headers["X-Snapshot-Version"] = str(version_of(entry.fetched_at))
+    return response
+
+
+async def batch_response(request: Request, kind: str, leagues: str):
+    """Снимки нескольких лиг одним ответом; промахи кэша догружаются параллельно.
+
+    Лиги, которые получить не удалось, попадают в "errors", остальные отдаются.
+    """
     try:
-        return fetch_standings_normalized("SA")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+        codes = [resolve_league(league.strip()) for league in leagues.split(",") if league.strip()]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    codes = list(dict.fromkeys(codes))
+    if not codes:
+        raise HTTPException(status_code=400, detail="leagues must not be empty")
 
-@app.get("/standings/ligue-1", response_model=StandingsResponse)
-def get_ligue_1_standings():
-    """Возвращает таблицу Ligue 1."""
+    results = await asyncio.gather(
+        *(get_snapshot_entry(kind, code) for code in codes), return_exceptions=True
+    )
+    entries, errors = [], {}
+    for code, result in zip(codes, results):
+        if isinstance(result, Exception):
+            errors[code] = f"Upstream error: {result}"
+        else:
+            entries.append((code, result))
+    if not entries:
+        raise HTTPException(status_code=502, detail=errors)
+
+    parts = [(code, cache.encoded(entry)) for code, entry in entries]
+    encoded = await asyncio.to_thread(encode_batch, parts, errors)
+    if errors:
+        # Частичный ответ не кэшируем, чтобы клиент скорее получил полный
+        control = "no-store"
+    else:
+        control = cache_control(
+            min(entry.fresh_until for _, entry in entries),
+            min(entry.stale_until - entry.fresh_until for _, entry in entries),
+        )
+    return encoded_response(request, encoded, control)
+
+
+def encoded_response(request: Request, encoded, control: str):
+    """Ответ из EncodedSnapshot: 304 по валидаторам или байты в подходящей кодировке."""
+    headers = {
+        "ETag": encoded.etag,
+        "Last-Modified": encoded.last_modified,
+        "Cache-Control": control,
+        "Vary": "Accept-Encoding",
+    }
+    if encoded.not_modified(
+        request.headers.get("if-none-match"), request.headers.get("if-modified-since")
+    ):
+        return Response(status_code=304, headers=headers)
+
+    body, content_encoding = encoded.pick(request.headers.get("accept-encoding"))
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(data):
+    """JSON прямо из записей снимков (orjson) - без jsonable_encoder и промежуточных словарей."""
+    return Response(content=dumps(data), media_type="application/json")
+
+
+# --- Изменения снимков: дифф по версии и поток SSE ---
+
+SSE_HEARTBEAT = 15
+
+
+async def changes_response(kind: str, league: str, since: Optional[int]):
+    code = parse_league(league)
     try:
-        return fetch_standings_normalized("FL1")
+        # Журнал заполняется при загрузке снимка
+        await get_snapshot_entry(kind, code)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    return json_response(changelog.since(kind, code, since))
+
+
+def changes_stream(request: Request, kind: str, league: str):
+    """Поток SSE с диффами снимка; при переподключении догоняет по Last-Event-ID."""
+    code = parse_league(league)
+    topic = (kind, code)
+
+    async def events():
+        # Подписываемся до догоняющего диффа, чтобы не пропустить события между ними
+        queue = hub.subscribe(topic)
+        try:
+            try:
+                # Журнал заполняется при загрузке снимка - загружаем, если воркер его ещё не видел
+                await get_snapshot_entry(kind, code)
+            except Exception:
+                # Upstream недоступен - снимок придёт позже через watch_store_changes
+                pass
+            last_event_id = request.headers.get("last-event-id")
+            since = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+            current = changelog.since(kind, code, since)
+            if current is not None:
+                if since is None:
+                    # Новый клиент получает только версию, сами данные - обычным GET
+                    yield sse_message(current["version"], "version", {"version": current["version"]})
+                elif current["changed"] or current["removed"]:
+                    yield sse_message(current["version"], "reset" if current["reset"] else "diff", current)
+
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            hub.unsubscribe(topic, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# --- Эндпоинты для таблиц лиг ---
+
+# С ?leagues= ответ - пачка таблиц, без него - одна таблица
+@app.get("/standings", response_model=Union[StandingsResponse, StandingsBatchResponse])
+async def get_standings(request: Request, leagues: Optional[str] = None):
+    """Таблица Premier League или, с ?leagues=PL,PD,..., таблицы нескольких лиг одним ответом."""
+    if leagues:
+        return await batch_response(request, "standings", leagues)
+    return await snapshot_response(request, "standings", "PL")
+
+@app.get("/standings/{league}", response_model=StandingsResponse)
+async def get_league_standings(request: Request, league: str):
+    """Возвращает таблицу лиги: /standings/la-liga, /standings/bundesliga, ... или /standings/PD."""
+    return await snapshot_response(request, "standings", parse_league(league))
+
+
+@app.get("/standings/{league}/changes")
+async def get_standings_changes(league: str, since: Optional[int] = None):
+    """Строки таблицы, изменившиеся после версии since (reset=true - нужна вся таблица)."""
+    return await changes_response("standings", league, since)
+
+@app.get("/standings/{league}/stream")
+def stream_standings_changes(request: Request, league: str):
+    """SSE: события diff при каждом изменении таблицы лиги."""
+    return changes_stream(request, "standings", league)
 
 
 # --- Эндпоинты для получения реальных данных игроков ---
 
-@app.get("/players/premier-league")
-def get_premier_league_players():
-    """Возвращает всех реальных игроков Premier League."""
+@app.get("/players")
+async def query_players(
+    league: Optional[str] = None,
+    team: Optional[str] = None,
+    teamId: Optional[int] = None,
+    position: Optional[str] = None,
+    nationality: Optional[str] = None,
+    ageMin: Optional[int] = Query(None, ge=0),
+    ageMax: Optional[int] = Query(None, ge=0),
+    q: Optional[str] = None,
+    sort: str = "name",
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Поиск игроков по всем лигам с фильтрами, сортировкой и постраничной выдачей.
+
+    q ищет подстроку в имени, команде или гражданстве (без учёта регистра и диакритики).
+    """
+    if sort.lstrip("-") not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_FIELDS)}")
     try:
-        return get_players_by_competition("PL")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+        code = resolve_league(league) if league else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    leagues = [code] if code else LEAGUES
+    index, errors = await get_player_index(leagues)
+    # Ошибка по лиге означает, что для неё нет даже устаревшего снимка
+    if len(errors) == len(leagues):
+        raise HTTPException(status_code=502, detail=f"Upstream error: {errors}")
 
-@app.get("/players/la-liga")
-def get_la_liga_players():
-    """Возвращает всех реальных игроков La Liga."""
+    filters = {
+        "league": code,
+        "team": team,
+        "teamId": teamId,
+        "position": position,
+        "nationality": nationality,
+    }
     try:
-        return get_players_by_competition("PD")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+        page = index.query(filters, q=q, age_min=ageMin, age_max=ageMax,
+                           sort=sort, cursor=cursor, limit=limit)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if errors:
+        page["errors"] = errors
+    return json_response(page)
+
+
+@app.get("/players/batch")
+async def get_players_batch(request: Request, leagues: str = ",".join(LEAGUES)):
+    """Составы нескольких лиг одним ответом: /players/batch?leagues=PL,PD,BL1."""
+    return await batch_response(request, "players", leagues)
+
+@app.get("/players/{league}")
+async def get_league_players(request: Request, league: str):
+    """Возвращает всех реальных игроков лиги: /players/premier-league, /players/la-liga, ..."""
+    return await snapshot_response(request, "players", parse_league(league))
 
-@app.get("/players/bundesliga")
-def get_bundesliga_players():
-    """Возвращает всех реальных игроков Bundesliga."""
+
+@app.get("/players/{league}/stats")
+async def get_league_player_stats(request: Request, league: str):
+    """Игроки лиги с голами и передачами (составы, соединённые с бомбардирами)."""
+    code = parse_league(league)
     try:
-        return get_players_by_competition("BL1")
+        stats = await get_player_stats(code)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+    return encoded_response(
+        request, stats.encoded, cache_control(stats.fresh_until, stats.stale_until - stats.fresh_until)
+    )
+
+
+@app.get("/players/{league}/changes")
+async def get_players_changes(league: str, since: Optional[int] = None):
+    """Игроки лиги, изменившиеся после версии since."""
+    return await changes_response("players", league, since)
+
+@app.get("/players/{league}/stream")
+def stream_players_changes(request: Request, league: str):
+    """SSE: события diff при каждом изменении составов лиги."""
+    return changes_stream(request, "players", league)
 
-@app.get("/players/serie-a")
-def get_serie_a_players():
-    """Возвращает всех реальных игроков Serie A."""
+
+# --- Лидерборды ---
+
+@app.get("/leaderboards")
+async def get_leaderboards(
+    league: Optional[str] = None,
+    teamId: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """Лучшие по голам, передачам и гол+пас, а также суммы по командам: ?league=&teamId=&limit=."""
     try:
-        return get_players_by_competition("SA")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+        leagues = [resolve_league(league)] if league else LEAGUES
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    results = await asyncio.gather(*(get_player_stats(code) for code in leagues), return_exceptions=True)
+    found, errors = [], {}
+    for code, result in zip(leagues, results):
+        if isinstance(result, Exception):
+            errors[code] = f"Upstream error: {result}"
+        else:
+            found.append(result.leaders(limit, teamId))
+    if not found:
+        raise HTTPException(status_code=502, detail=errors)
+
+    # Лидерборды лиг уже отсортированы - для всех лиг достаточно слить их
+    response = {
+        field: list(heapq.merge(*(part[field] for part in found), key=board_key(field)))[:limit]
+        for field in BOARDS
+    }
+    response["teams"] = list(heapq.merge(*(part["teams"] for part in found), key=team_key))
+    if errors:
+        response["errors"] = errors
+    return json_response(response)
+
+
+# --- Матчи ---
+
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
 
-@app.get("/players/ligue-1")
-def get_ligue_1_players():
-    """Возвращает всех реальных игроков Ligue 1."""
+
+@app.get("/matches")
+async def get_matches(
+    league: Optional[str] = None,
+    team: Optional[int] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    status: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+):
+    """Матчи сезона: ?league=&team=&from=YYYY-MM-DD&to=YYYY-MM-DD&status=SCHEDULED,FINISHED."""
+    for value in (date_from, date_to):
+        if value is not None and not ISO_DATE.match(value):
+            raise HTTPException(status_code=400, detail="from/to must be ISO dates (YYYY-MM-DD)")
     try:
-        return get_players_by_competition("FL1")
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Upstream error: {e}")
+        leagues = [resolve_league(league)] if league else LEAGUES
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    statuses = {s.strip().upper() for s in status.split(",") if s.strip()} if status else None
+
+    results = await asyncio.gather(
+        *(get_match_index(code) for code in leagues), return_exceptions=True
+    )
+    found, errors = [], {}
+    for code, result in zip(leagues, results):
+        if isinstance(result, Exception):
+            errors[code] = f"Upstream error: {result}"
+            continue
+        _, index = result
+        matches = index.query(team_id=team, date_from=date_from, date_to=date_to, statuses=statuses)
+        found.append([(match["utcDate"], match["id"], code, match) for match in matches])
+    if not found:
+        raise HTTPException(status_code=502, detail=errors)
+
+    # Списки лиг уже отсортированы по времени - достаточно слить их
+    merged = list(heapq.merge(*found, key=lambda item: (item[0], item[1])))
+    response = {
+        "total": len(merged),
+        "matches": [{**match, "league": code} for _, _, code, match in merged[:limit]],
+    }
+    if errors:
+        response["errors"] = errors
+    return json_response(response)
+
+
+# --- Состояние фонового прогрева ---
+@app.get("/warmer/status")
+def warmer_status():
+    """Когда каждая лига обновлялась, когда обновится снова и последние ошибки."""
+    return {"enabled": WARMER_ENABLED, **warmer.status()}
+
+
+# --- Метрики в формате Prometheus ---
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Латентность маршрутов, запросы к upstream, кэш, квота и возраст снимков."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 # --- Health Check (без изменений) ---
 @app.get("/health")
 def health_check():
     """Проверка состояния API."""
-    return {"status": "healthy", "message": "Football API is running"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "message": "Football API is running",
+        "upstream": upstream.breakers_state(),
+    }
\ No newline at end of file
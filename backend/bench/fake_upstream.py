@@ -0,0 +1,282 @@
+"""Локальная замена football-data.org для бенчмарков.
+
+Отдаёт записанные ответы из bench/fixtures (см. record.py), а если записи
+нет - детерминированно сгенерированные данные той же формы. Умеет
+добавлять задержку, ответы 429 с Retry-After и ошибки 5xx, а также
+считает запросы по эндпоинтам (GET /_stats, POST /_reset).
+
+Запуск: uvicorn bench.fake_upstream:app --port 9000 (из папки backend),
+настройки - переменные окружения FAKE_*.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+FIXTURES = Path(os.getenv("FAKE_FIXTURES", Path(__file__).parent / "fixtures"))
+LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", "80"))
+JITTER_MS = float(os.getenv("FAKE_JITTER_MS", "20"))
+RATE_429 = float(os.getenv("FAKE_429_RATE", "0"))
+RATE_5XX = float(os.getenv("FAKE_5XX_RATE", "0"))
+RETRY_AFTER = int(os.getenv("FAKE_RETRY_AFTER", "2"))
+# Минутная квота как у football-data.org; 0 - без ограничения
+QUOTA = int(os.getenv("FAKE_QUOTA_PER_MINUTE", "0"))
+SEED = int(os.getenv("FAKE_SEED", "42"))
+
+COMPETITIONS = {
+    "PL": ("Premier League", 20),
+    "PD": ("Primera Division", 20),
+    "BL1": ("Bundesliga", 18),
+    "SA": ("Serie A", 20),
+    "FL1": ("Ligue 1", 18),
+}
+POSITIONS = ["Goalkeeper", "Defence", "Midfield", "Offence"]
+NATIONS = ["England", "Spain", "Germany", "Italy", "France", "Brazil", "Argentina", "Portugal", "Norway", "Côte d'Ivoire"]
+FIRST = ["Martin", "Kylian", "Erling", "Thomas", "Luka", "Bukayo", "Pedri", "Jamal", "Nicolò", "Ousmane", "Jérôme", "Søren"]
+LAST = ["Ødegaard", "Mbappé", "Haaland", "Müller", "Modrić", "Saka", "González", "Musiala", "Barella", "Dembélé", "Boateng", "Kjær"]
+
+app = FastAPI(title="Fake football-data.org")
+calls = Counter()
+_window = {"started": time.monotonic(), "used": 0}
+
+
+# --- Синтетические данные ---
+
+def _team_ids(code):
+    base = (list(COMPETITIONS).index(code) + 1) * 1000
+    return [base + i for i in range(COMPETITIONS[code][1])]
+
+
+def _team(team_id):
+    return {
+        "id": team_id,
+        "name": f"FC Bench {team_id}",
+        "shortName": f"Bench {team_id}",
+        "crest": f"https://crests.example/{team_id}.png",
+    }
+
+
+def _squad(team_id):
+    rng = random.Random(SEED * 100003 + team_id)
+    squad = []
+    for n in range(25):
+        birth = date(1988, 1, 1) + timedelta(days=rng.randint(0, 365 * 18))
+        squad.append({
+            "id": team_id * 100 + n,
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+            "position": POSITIONS[0] if n < 3 else rng.choice(POSITIONS[1:]),
+            "dateOfBirth": birth.isoformat(),
+            "nationality": rng.choice(NATIONS),
+            "shirtNumber": n + 1,
+        })
+    return squad
+
+
+def _standings(code):
+    name = COMPETITIONS[code][0]
+    rng = random.Random(f"{SEED}:{code}:{int(time.time() // 60)}")
+    rows = []
+    for team_id in _team_ids(code):
+        won, draw, lost = rng.randint(0, 15), rng.randint(0, 8), rng.randint(0, 12)
+        gf, ga = rng.randint(10, 60), rng.randint(10, 50)
+        rows.append({
+            "team": _team(team_id),
+            "playedGames": won + draw + lost,
+            "won": won, "draw": draw, "lost": lost,
+            "points": won * 3 + draw,
+            "goalsFor": gf, "goalsAgainst": ga, "goalDifference": gf - ga,
+        })
+    rows.sort(key=lambda r: (-r["points"], -r["goalDifference"]))
+    for position, row in enumerate(rows, start=1):
+        row["position"] = position
+    return {
+        "competition": {"code": code, "name": name},
+        "season": {"startDate": "2025-08-15"},
+        "standings": [{"type": "TOTAL", "table": rows}],
+    }
+
+
+def _team_payload(team_id):
+    return {**_team(team_id), "squad": _squad(team_id)}
+
+
+def _scorers(code, limit):
+    rng = random.Random(f"{SEED}:{code}:scorers")
+    pool = [(team_id, player) for team_id in _team_ids(code) for player in _squad(team_id)[3:]]
+    picked = rng.sample(pool, min(limit, len(pool)))
+    scorers = []
+    for team_id, player in picked:
+        scorers.append({
+            "player": player,
+            "team": _team(team_id),
+            "goals": rng.randint(1, 25),
+            "assists": rng.randint(0, 12),
+            "penalties": rng.randint(0, 5),
+        })
+    scorers.sort(key=lambda s: -s["goals"])
+    return {
+        "competition": {"code": code, "name": COMPETITIONS[code][0]},
+        "season": {"startDate": "2025-08-15"},
+        "scorers": scorers,
+    }
+
+
+def _matches(code):
+    """Двухкруговой сезон: тур раз в неделю с 2025-08-16, статусы и счёт - по текущему времени."""
+    rng = random.Random(f"{SEED}:{code}:matches")
+    teams = _team_ids(code)
+    kickoff = datetime(2025, 8, 16, 14, 0, tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    # Круговая система: первая команда на месте, остальные вращаются
+    rotation = teams[1:]
+    rounds = []
+    for _ in range(len(teams) - 1):
+        lineup = [teams[0]] + rotation
+        half = len(lineup) // 2
+        rounds.append(list(zip(lineup[:half], reversed(lineup[half:]))))
+        rotation = rotation[-1:] + rotation[:-1]
+    rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+
+    matches = []
+    for matchday, pairs in enumerate(rounds, start=1):
+        for n, (home, away) in enumerate(pairs):
+            start = kickoff + timedelta(weeks=matchday - 1, hours=2 * (n % 4))
+            home_goals, away_goals = rng.randint(0, 4), rng.randint(0, 3)
+            if now >= start + timedelta(hours=2):
+                status, score = "FINISHED", (home_goals, away_goals)
+            elif now >= start:
+                status, score = "IN_PLAY", (home_goals // 2, away_goals // 2)
+            else:
+                status, score = "TIMED", (None, None)
+            winner = None
+            if status == "FINISHED":
+                winner = "HOME_TEAM" if score[0] > score[1] else "AWAY_TEAM" if score[1] > score[0] else "DRAW"
+            matches.append({
+                "id": (list(COMPETITIONS).index(code) + 1) * 100000 + matchday * 100 + n,
+                "utcDate": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "status": status,
+                "matchday": matchday,
+                "stage": "REGULAR_SEASON",
+                "venue": f"Bench Arena {home}",
+                "lastUpdated": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "season": {"startDate": "2025-08-15"},
+                "homeTeam": _team(home),
+                "awayTeam": _team(away),
+                "score": {"winner": winner, "fullTime": {"home": score[0], "away": score[1]}},
+            })
+    return matches
+
+
+def _fixture(*parts):
+    path = FIXTURES.joinpath(*parts).with_suffix(".json")
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return None
+
+
+# --- Искажения: задержка, квота, 429 и 5xx ---
+
+def _quota_headers():
+    if not QUOTA:
+        return {}
+    now = time.monotonic()
+    if now - _window["started"] >= 60:
+        _window.update(started=now, used=0)
+    reset = max(int(60 - (now - _window["started"])), 0)
+    return {
+        "X-Requests-Available-Minute": str(max(QUOTA - _window["used"], 0)),
+        "X-RequestCounter-Reset": str(reset),
+    }
+
+
+async def _respond(endpoint, payload_fn):
+    calls[endpoint] += 1
+    await asyncio.sleep(max(LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS), 0) / 1000)
+
+    if QUOTA:
+        _quota_headers()
+        if _window["used"] >= QUOTA:
+            calls[f"{endpoint} 429"] += 1
+            headers = _quota_headers()
+            headers["Retry-After"] = headers["X-RequestCounter-Reset"]
+            return JSONResponse({"message": "quota exceeded"}, status_code=429, headers=headers)
+        _window["used"] += 1
+    if RATE_429 and random.random() < RATE_429:
+        calls[f"{endpoint} 429"] += 1
+        return JSONResponse(
+            {"message": "Too many requests"}, status_code=429, headers={"Retry-After": str(RETRY_AFTER)}
+        )
+    if RATE_5XX and random.random() < RATE_5XX:
+        calls[f"{endpoint} 5xx"] += 1
+        return JSONResponse({"message": "upstream failure"}, status_code=503)
+
+    payload = payload_fn()
+    if payload is None:
+        return JSONResponse({"message": "not found"}, status_code=404)
+    return JSONResponse(payload, headers=_quota_headers())
+
+
+@app.get("/v4/competitions/{code}/standings")
+async def standings(code: str):
+    return await _respond(
+        "/competitions/{id}/standings",
+        lambda: _fixture("standings", code) or (_standings(code) if code in COMPETITIONS else None),
+    )
+
+
+@app.get("/v4/competitions/{code}/scorers")
+async def scorers(code: str, limit: int = 10):
+    def payload():
+        recorded = _fixture("scorers", code)
+        if recorded is not None:
+            return {**recorded, "scorers": recorded["scorers"][:limit]}
+        return _scorers(code, limit) if code in COMPETITIONS else None
+    return await _respond("/competitions/{id}/scorers", payload)
+
+
+@app.get("/v4/competitions/{code}/matches")
+async def matches(code: str, dateFrom: str = None, dateTo: str = None):
+    def payload():
+        recorded = _fixture("matches", code)
+        if recorded is None and code not in COMPETITIONS:
+            return None
+        found = recorded["matches"] if recorded is not None else _matches(code)
+        if dateFrom:
+            found = [m for m in found if m["utcDate"][:10] >= dateFrom]
+        if dateTo:
+            found = [m for m in found if m["utcDate"][:10] <= dateTo]
+        return {
+            "competition": {"code": code, "name": (recorded or {}).get("competition", {}).get("name")
+                            or COMPETITIONS[code][0]},
+            "resultSet": {"count": len(found), "first": "2025-08-16"},
+            "matches": found,
+        }
+    return await _respond("/competitions/{id}/matches", payload)
+
+
+@app.get("/v4/teams/{team_id}")
+async def team(team_id: int):
+    known = any(team_id in _team_ids(code) for code in COMPETITIONS)
+    return await _respond(
+        "/teams/{id}",
+        lambda: _fixture("teams", str(team_id)) or (_team_payload(team_id) if known else None),
+    )
+
+
+@app.get("/_stats")
+def stats():
+    return dict(calls)
+
+
+@app.post("/_reset")
+def reset():
+    calls.clear()
+    _window.update(started=time.monotonic(), used=0)
+    return {"ok": True}
@@ -0,0 +1,186 @@
+"""Память, которую воркер держит под игроков пяти лиг: словари против записей.
+
+Составы и бомбардиры генерируются так же, как в fake_upstream, снимки
+кодируются в JSON так же, как их хранит SnapshotStore. Дальше сравниваются
+два представления после загрузки снимков:
+
+    dicts   - прежнее: словарь на игрока, плюс копии словарей в статистике
+              лиги и в индексе поиска ({**player, ...});
+    records - records.py: PlayerRecord / PlayerLine со слотами и
+              интернированными строками, статистика и индекс делят записи.
+
+Память меряется через tracemalloc (что осталось живым после сборки),
+заодно - время сериализации обогащённых составов всех лиг.
+
+Пример (из папки backend):
+    python -m bench.memory --repeat 20
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from bench.fake_upstream import COMPETITIONS, _scorers, _team_ids, _team_payload
+from bench.run import RESULTS, _git_rev
+from encoding import dumps
+from records import PlayerLine, age_on, players_from_json
+
+
+def build_payloads(scorers_limit):
+    """{лига: (JSON снимка "players", список бомбардиров)} для всех лиг fake_upstream."""
+    today = date.today()
+    payloads = {}
+    for code, (name, _) in COMPETITIONS.items():
+        players = []
+        for team_id in _team_ids(code):
+            team = _team_payload(team_id)
+            for player in team["squad"]:
+                players.append({
+                    "id": player["id"],
+                    "name": player["name"],
+                    "position": player.get("position") or "Unknown",
+                    "nationality": player.get("nationality") or "Unknown",
+                    "dateOfBirth": player.get("dateOfBirth"),
+                    "team": team["name"],
+                    "teamId": team["id"],
+                    "shirtNumber": player.get("shirtNumber"),
+                    "role": "PLAYER",
+                    "age": age_on(player.get("dateOfBirth"), today),
+                })
+        snapshot = dumps({"competition": name, "season": "2025", "players": players})
+        payloads[code] = (snapshot, _scorers(code, scorers_limit)["scorers"])
+    return payloads
+
+
+def _stats(row):
+    goals = (row["goals"] or 0) if row else 0
+    assists = (row["assists"] or 0) if row else 0
+    return {
+        "goals": goals,
+        "assists": assists,
+        "goalsAssists": goals + assists,
+        "penalties": (row["penalties"] or 0) if row else 0,
+        "playedMatches": row.get("playedMatches") if row else None,
+    }
+
+
+def load_dicts(payloads):
+    return {code: json.loads(snapshot) for code, (snapshot, _) in payloads.items()}
+
+
+def enrich_dicts(snapshots, payloads):
+    enriched, index_rows = {}, []
+    for code, snapshot in snapshots.items():
+        by_id = {row["player"]["id"]: row for row in payloads[code][1]}
+        enriched[code] = [
+            {**player, "league": code, **_stats(by_id.get(player["id"]))}
+            for player in snapshot["players"]
+        ]
+        index_rows.extend({**player, "league": code} for player in snapshot["players"])
+    return enriched, index_rows
+
+
+def load_records(payloads):
+    today = date.today()
+    return {code: players_from_json(json.loads(snapshot), today) for code, (snapshot, _) in payloads.items()}
+
+
+def enrich_records(snapshots, payloads):
+    enriched, index_rows = {}, []
+    for code, snapshot in snapshots.items():
+        by_id = {row["player"]["id"]: row for row in payloads[code][1]}
+        enriched[code] = [
+            PlayerLine.from_record(player, league=code, **_stats(by_id.get(player.id)))
+            for player in snapshot["players"]
+        ]
+        index_rows.extend(enriched[code])
+    return enriched, index_rows
+
+
+def retained(build, *args):
+    """(результат, байт, оставшихся живыми после build)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build(*args)
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def serialize_ms(enriched, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for players in enriched.values():
+            dumps({"players": players})
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def measure(load, enrich, payloads, repeat):
+    snapshots, snapshot_bytes = retained(load, payloads)
+    (enriched, _), stats_bytes = retained(enrich, snapshots, payloads)
+    players = sum(len(snapshot["players"]) for snapshot in snapshots.values())
+    return {
+        "players": players,
+        "snapshot_bytes": snapshot_bytes,
+        "stats_and_index_bytes": stats_bytes,
+        "total_bytes": snapshot_bytes + stats_bytes,
+        "bytes_per_player": round((snapshot_bytes + stats_bytes) / players, 1),
+        "serialize_ms": serialize_ms(enriched, repeat),
+    }, enriched
+
+
+def main(args):
+    payloads = build_payloads(args.scorers_limit)
+    dicts, dict_rows = measure(load_dicts, enrich_dicts, payloads, args.repeat)
+    records, record_rows = measure(load_records, enrich_records, payloads, args.repeat)
+
+    # Оба представления должны давать один и тот же JSON
+    identical = all(
+        dumps({"players": dict_rows[code]}) == dumps({"players": record_rows[code]}) for code in dict_rows
+    )
+    report = {
+        "scenario": "memory",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "results": {
+            "dicts": dicts,
+            "records": records,
+            "memory_ratio": round(records["total_bytes"] / dicts["total_bytes"], 3),
+            "identical_json": identical,
+        },
+    }
+    for name, result in (("dicts", dicts), ("records", records)):
+        print(
+            f"{name}: {result['players']} игроков, {result['total_bytes'] / 2 ** 20:.2f} MiB "
+            f"({result['bytes_per_player']} байт/игрок), сериализация {result['serialize_ms']} мс",
+            file=sys.stderr,
+        )
+    out = Path(args.out) if args.out else RESULTS / f"memory-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Результаты: {out}", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="повторов сериализации")
+    parser.add_argument("--scorers-limit", type=int, default=100)
+    parser.add_argument("--out", help="путь к JSON с результатами")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,56 @@
+"""Записывает настоящие ответы football-data.org в bench/fixtures для fake_upstream.
+
+Тратит квоту один раз (~115 запросов на пять лиг): python -m bench.record
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_BASE_URL = "https://api.football-data.org/v4"
+FIXTURES = Path(__file__).parent / "fixtures"
+LEAGUES = ["PL", "PD", "BL1", "SA", "FL1"]
+
+
+def get(client, path, params=None):
+    while True:
+        response = client.get(f"{API_BASE_URL}{path}", params=params)
+        if response.status_code == 429:
+            wait = int(response.headers.get("X-RequestCounter-Reset", "60")) + 1
+            print(f"429, ждём {wait} сек...", file=sys.stderr)
+            time.sleep(wait)
+            continue
+        response.raise_for_status()
+        if response.headers.get("X-Requests-Available-Minute") == "0":
+            time.sleep(int(response.headers.get("X-RequestCounter-Reset", "60")) + 1)
+        return response.json()
+
+
+def save(data, *parts):
+    path = FIXTURES.joinpath(*parts).with_suffix(".json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def main(leagues):
+    headers = {"X-Auth-Token": os.getenv("API_KEY")}
+    with httpx.Client(headers=headers, timeout=20) as client:
+        for code in leagues:
+            standings = get(client, f"/competitions/{code}/standings")
+            save(standings, "standings", code)
+            save(get(client, f"/competitions/{code}/scorers", {"limit": 100}), "scorers", code)
+            save(get(client, f"/competitions/{code}/matches"), "matches", code)
+            for row in standings["standings"][0]["table"]:
+                team_id = row["team"]["id"]
+                save(get(client, f"/teams/{team_id}"), "teams", str(team_id))
+            print(f"{code}: записано", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or LEAGUES)
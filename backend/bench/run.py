@@ -0,0 +1,236 @@
+"""Нагрузочный бенчмарк backend против локального fake_upstream.
+
+Поднимает fake_upstream и app.py (uvicorn) в отдельных процессах, гоняет
+конкурентную нагрузку по каждому эндпоинту и сохраняет в JSON: p50/p95/p99,
+пропускную способность, память процесса и число запросов к upstream на
+1000 клиентских запросов.
+
+Пример (из папки backend):
+    python -m bench.run --requests 2000 --concurrency 50
+    python -m bench.run --scenario flaky --fake-429-rate 0.1 --fake-5xx-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parent.parent
+RESULTS = Path(__file__).parent / "results"
+
+DEFAULT_ENDPOINTS = [
+    "/standings",
+    "/standings/la-liga",
+    "/standings?leagues=PL,PD,BL1,SA,FL1",
+    "/players/premier-league",
+    "/players?q=mul&sort=-age&limit=50",
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid):
+    """RSS процесса и всех его потомков (воркеры uvicorn), по /proc."""
+    total = 0
+    pids = [pid]
+    try:
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+        pids += [int(child) for child in children]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            for line in Path(f"/proc/{p}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    return total
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def start_server(module, port, env, workers=1):
+    cmd = [
+        sys.executable, "-m", "uvicorn", module,
+        "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning", "--workers", str(workers),
+    ]
+    return subprocess.Popen(cmd, cwd=BACKEND, env={**os.environ, **env})
+
+
+async def wait_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} не поднялся за {timeout} сек")
+
+
+async def run_endpoint(client, base, endpoint, total, concurrency, app_pid):
+    latencies, statuses = [], {}
+    peak_rss = rss_bytes(app_pid)
+    remaining = total - 1
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await request_once(client, base + endpoint, latencies, statuses)
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, rss_bytes(app_pid))
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_memory())
+    started = time.perf_counter()
+    # Первый запрос отдельно: холодный промах кэша не смешиваем с конкурентной нагрузкой
+    await request_once(client, base + endpoint, latencies, statuses)
+    first = latencies[0]
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    sampler.cancel()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "statuses": statuses,
+        "first_request_ms": round(first * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+        "rss_mb": round(rss_bytes(app_pid) / 2**20, 1),
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+    }
+
+
+async def request_once(client, url, latencies, statuses):
+    started = time.perf_counter()
+    try:
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    latencies.append(time.perf_counter() - started)
+    statuses[status] = statuses.get(status, 0) + 1
+
+
+async def main(args):
+    fake_port, app_port = free_port(), free_port()
+    fake_base = f"http://127.0.0.1:{fake_port}"
+    app_base = f"http://127.0.0.1:{app_port}"
+    db = Path(tempfile.mkdtemp()) / "bench.db"
+
+    fake_env = {
+        "FAKE_LATENCY_MS": str(args.fake_latency_ms),
+        "FAKE_429_RATE": str(args.fake_429_rate),
+        "FAKE_5XX_RATE": str(args.fake_5xx_rate),
+        "FAKE_QUOTA_PER_MINUTE": str(args.fake_quota),
+    }
+    app_env = {
+        "FOOTBALL_DATA_URL": f"{fake_base}/v4",
+        "API_KEY": "bench",
+        "SNAPSHOT_DB": str(db),
+        "WARMER_ENABLED": "1" if args.warmer else "0",
+        "API_REQUESTS_PER_MINUTE": str(args.fake_quota or 100000),
+        "LOG_LEVEL": "WARNING",
+    }
+    fake = start_server("bench.fake_upstream:app", fake_port, fake_env)
+    app = None
+    try:
+        await wait_ready(f"{fake_base}/_stats")
+        app = start_server("app:app", app_port, app_env, workers=args.workers)
+        await wait_ready(f"{app_base}/health")
+
+        results = {}
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            for endpoint in args.endpoints:
+                await client.post(f"{fake_base}/_reset")
+                result = await run_endpoint(
+                    client, app_base, endpoint, args.requests, args.concurrency, app.pid
+                )
+                upstream = (await client.get(f"{fake_base}/_stats")).json()
+                calls = sum(n for name, n in upstream.items() if " " not in name)
+                result["upstream_calls"] = upstream
+                result["upstream_calls_per_1000"] = round(calls * 1000 / result["requests"], 2)
+                results[endpoint] = result
+                print(
+                    f"{endpoint}: p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+                    f"{result['throughput_rps']} rps, upstream/1000={result['upstream_calls_per_1000']}",
+                    file=sys.stderr,
+                )
+    finally:
+        for proc in (app, fake):
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    report = {
+        "scenario": args.scenario,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "results": results,
+    }
+    out = Path(args.out) if args.out else RESULTS / f"{args.scenario}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Результаты: {out}", file=sys.stderr)
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="baseline")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--requests", type=int, default=1000, help="запросов на эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="воркеров uvicorn у app")
+    parser.add_argument("--warmer", action="store_true", help="включить фоновый прогрев")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--fake-latency-ms", type=float, default=80)
+    parser.add_argument("--fake-429-rate", type=float, default=0)
+    parser.add_argument("--fake-5xx-rate", type=float, default=0)
+    parser.add_argument("--fake-quota", type=int, default=0, help="минутная квота fake upstream, 0 - без неё")
+    parser.add_argument("--out", help="путь к JSON с результатами")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
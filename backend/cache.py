@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    __slots__ = ("value", "fetched_at", "fresh_until", "stale_until", "encoded")
+
+    def __init__(self, value, fetched_at, ttl, max_stale, encoded=None):
+        self.value = value
+        self.encoded = encoded
+        self.fetched_at = fetched_at
+        self.fresh_until = fetched_at + ttl
+        self.stale_until = self.fresh_until + max_stale
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class SnapshotCache:
+    """Кэш снимков данных по ключу (вид данных, id лиги).
+
+    Для каждого вида свой TTL. Просроченный снимок ещё max_stale секунд
+    отдаётся как есть, пока в фоне идёт обновление (stale-while-revalidate).
+    Одновременные промахи по одному ключу ждут один общий запрос к upstream.
+    Если задан store, промах сначала ищется на диске, а свежие снимки
+    сохраняются туда после каждой загрузки. Store общий для воркеров:
+    перед походом в upstream кэш забирает более новый снимок соседа, а сам
+    запрос делает только держатель блокировки ключа, остальные ждут его
+    результат в store - не дольше wait_timeout секунд (держатель мог упасть),
+    после чего запрос получает последний снимок или ошибку.
+
+    encoder(value, fetched_at), если задан, вызывается один раз на снимок
+    (вне event loop) - например, чтобы заранее сериализовать ответ.
+    Подписчики из listeners вызываются в event loop на каждый новый снимок:
+    listener(kind, key, entry, previous).
+    """
+
+    def __init__(self, policies, store=None, holder=None, lease_ttl=600, poll_interval=1.0,
+                 encoder=None, wait_timeout=60.0):
+        # policies: {kind: (ttl, max_stale)}
+        self.policies = policies
+        self.store = store
+        self.holder = holder
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.encoder = encoder
+        self.listeners = []
+        # Счётчики обращений: {(kind, "hit" | "stale" | "miss"): n}
+        self.stats = {}
+        self._entries = {}
+        self._inflight = {}
+        self._disk_reads = {}
+
+    async def peek(self, kind, key):
+        """Текущий снимок без обращения к сети (или None)."""
+        entry = self._entries.get((kind, key))
+        if entry is None and self.store is not None:
+            entry = await self._load_from_store(kind, key)
+        return entry
+
+    def entries(self):
+        """[(kind, key, entry)] для всех снимков в памяти."""
+        return [(kind, key, entry) for (kind, key), entry in self._entries.items()]
+
+    def _count(self, kind, result):
+        self.stats[(kind, result)] = self.stats.get((kind, result), 0) + 1
+
+    def put(self, kind, key, value, fetched_at=None, encoded=None):
+        ttl, max_stale = self.policies[kind]
+        entry = CacheEntry(value, fetched_at or time.time(), ttl, max_stale, encoded)
+        previous = self._entries.get((kind, key))
+        self._entries[(kind, key)] = entry
+        for listener in self.listeners:
+            try:
+                listener(kind, key, entry, previous)
+            except Exception:
+                logger.exception("Ошибка подписчика кэша", extra={"kind": kind, "league": key})
+        return entry
+
+    async def _put_encoded(self, kind, key, value):
+        fetched_at = time.time()
+        encoded = None
+        if self.encoder is not None:
+            encoded = await asyncio.to_thread(self.encoder, value, fetched_at)
+        return self.put(kind, key, value, fetched_at, encoded)
+
+    def encoded(self, entry):
+        """Закодированный снимок (считается при первом обращении, если ещё нет)."""
+        if entry.encoded is None and self.encoder is not None:
+            entry.encoded = self.encoder(entry.value, entry.fetched_at)
+        return entry.encoded
+
+    def refresh(self, kind, key, loader):
+        """Запускает обновление ключа; повторные вызовы получают ту же задачу."""
+        task = self._inflight.get((kind, key))
+        if task is None:
+            task = asyncio.ensure_future(self._load(kind, key, loader))
+            self._inflight[(kind, key)] = task
+        return task
+
+    async def _load(self, kind, key, loader):
+        try:
+            if self.store is None:
+                return await self._put_encoded(kind, key, await loader(key))
+            return await self._load_shared(kind, key, loader)
+        finally:
+            self._inflight.pop((kind, key), None)
+
+    async def _load_shared(self, kind, key, loader):
+        known = self._entries.get((kind, key))
+        known_at = known.fetched_at if known is not None else 0
+        lease = f"refresh:{kind}:{key}"
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            newer = await asyncio.to_thread(self._read_newer, kind, key, known_at)
+            if newer is not None:
+                return self.put(kind, key, *newer)
+            if await asyncio.to_thread(self.store.try_acquire_lease, lease, self.holder, self.lease_ttl):
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{kind} {key} is still being refreshed by another worker")
+            # Другой воркер уже качает этот ключ - ждём его снимок в store
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            # Пока брали блокировку, предыдущий держатель мог успеть сохранить снимок
+            newer = await asyncio.to_thread(self._read_newer, kind, key, known_at)
+            if newer is not None:
+                return self.put(kind, key, *newer)
+            value = await loader(key)
+            entry = await self._put_encoded(kind, key, value)
+            try:
+                await asyncio.to_thread(self.store.save, kind, key, value, entry.fetched_at)
+            except Exception as e:
+                logger.warning("Не удалось сохранить снимок на диск: %s", e, extra={"kind": kind, "league": key})
+            return entry
+        finally:
+            await asyncio.to_thread(self.store.release_lease, lease, self.holder)
+
+    # Чтение из store не меняет состояние кэша и может идти в потоке;
+    # сам put всегда выполняется в event loop.
+
+    def _read_newer(self, kind, key, known_at):
+        stored_at = self.store.fetched_at(kind, key)
+        if stored_at is None or stored_at <= known_at:
+            return None
+        return self._read_store(kind, key)
+
+    def _read_store(self, kind, key):
+        """(value, fetched_at, encoded) из store или None."""
+        try:
+            record = self.store.load(kind, key)
+        except Exception as e:
+            logger.warning("Не удалось прочитать снимок с диска: %s", e, extra={"kind": kind, "league": key})
+            return None
+        if record is None:
+            return None
+        value, fetched_at = record
+        encoded = self.encoder(value, fetched_at) if self.encoder is not None else None
+        return value, fetched_at, encoded
+
+    async def _load_from_store(self, kind, key):
+        # Чтение, разбор и кодирование снимка - в потоке; одновременные промахи
+        # по одному ключу ждут одно чтение
+        task = self._disk_reads.get((kind, key))
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._read_store, kind, key))
+            self._disk_reads[(kind, key)] = task
+            task.add_done_callback(lambda _: self._disk_reads.pop((kind, key), None))
+        record = await asyncio.shield(task)
+        current = self._entries.get((kind, key))
+        if record is None or (current is not None and current.fetched_at >= record[1]):
+            return current
+        return self.put(kind, key, *record)
+
+    async def sync_from_store(self, kind, key):
+        """Забирает из store снимок новее текущего (его сохранил другой воркер).
+
+        Возвращает новую запись или None. Подписчики listeners получают
+        снимок так же, как после собственной загрузки.
+        """
+        if self.store is None:
+            return None
+        known = self._entries.get((kind, key))
+        newer = await asyncio.to_thread(self._read_newer, kind, key, known.fetched_at if known else 0)
+        if newer is None:
+            return None
+        current = self._entries.get((kind, key))
+        if current is not None and current.fetched_at >= newer[1]:
+            # Пока читали диск, в кэш попал снимок не старше этого
+            return None
+        return self.put(kind, key, *newer)
+
+    async def get_entry(self, kind, key, loader):
+        entry = self._entries.get((kind, key))
+        now = time.time()
+        if entry is None and self.store is not None:
+            entry = await self._load_from_store(kind, key)
+            if entry is not None and now >= entry.fresh_until:
+                # Снимок с диска отдаём сразу, даже очень старый, и обновляем в фоне
+                self._count(kind, "stale")
+                self.refresh(kind, key, loader).add_done_callback(_consume_exception)
+                return entry
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._count(kind, "hit")
+                return entry
+            if now < entry.stale_until:
+                self._count(kind, "stale")
+                task = self.refresh(kind, key, loader)
+                # Ошибку фонового обновления забираем, чтобы она не терялась в логах asyncio
+                task.add_done_callback(_consume_exception)
+                return entry
+        self._count(kind, "miss")
+        try:
+            # shield: отмена одного клиента не должна отменять общий запрос
+            return await asyncio.shield(self.refresh(kind, key, loader))
+        except Exception:
+            if entry is None:
+                raise
+            # Upstream недоступен: лучше последний удачный снимок, чем ошибка
+            return entry
+
+    async def get(self, kind, key, loader):
+        return (await self.get_entry(kind, key, loader)).value
+
+
+def _consume_exception(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Фоновое обновление кэша не удалось: %s", task.exception())
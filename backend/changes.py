@@ -0,0 +1,158 @@
+import asyncio
+from collections import deque
+
+from encoding import dumps
+
+
+def version_of(fetched_at):
+    """Версия снимка - время загрузки в мс: растёт монотонно и совпадает во всех воркерах."""
+    return int(fetched_at * 1000)
+
+
+def diff_rows(old_rows, new_rows):
+    """Построчное сравнение двух снимков, строки - {id: запись}.
+
+    Возвращает (changed, removed): изменённые или новые строки и id удалённых.
+    """
+    changed = [row for row_id, row in new_rows.items() if old_rows.get(row_id) != row]
+    removed = [row_id for row_id in old_rows if row_id not in new_rows]
+    return changed, removed
+
+
+class ChangeLog:
+    """Журнал изменений снимков по ключу (вид данных, лига).
+
+    Хранит строки последнего снимка и последние history диффов, чтобы
+    клиент мог запросить только изменения начиная со своей версии.
+    """
+
+    def __init__(self, row_sets, history=50):
+        # row_sets: {kind: (поле со списком записей, атрибут-ключ записи)}
+        self.row_sets = row_sets
+        self.history = history
+        self._rows = {}
+        self._versions = {}
+        self._diffs = {}
+
+    def version(self, kind, key):
+        return self._versions.get((kind, key))
+
+    def record(self, kind, key, value, fetched_at):
+        """Добавляет новый снимок; возвращает событие-дифф или None (первый снимок / нет изменений)."""
+        if kind not in self.row_sets:
+            return None
+        rows_field, id_field = self.row_sets[kind]
+        version = version_of(fetched_at)
+        if version <= self._versions.get((kind, key), -1):
+            return None
+
+        new_rows = {getattr(row, id_field): row for row in value.get(rows_field, [])}
+        old_rows = self._rows.get((kind, key))
+        self._rows[(kind, key)] = new_rows
+        previous = self._versions.get((kind, key))
+        self._versions[(kind, key)] = version
+        if old_rows is None:
+            return None
+
+        changed, removed = diff_rows(old_rows, new_rows)
+        event = {
+            "kind": kind,
+            "league": key,
+            "version": version,
+            "previous": previous,
+            "changed": changed,
+            "removed": removed,
+        }
+        diffs = self._diffs.setdefault((kind, key), deque(maxlen=self.history))
+        diffs.append(event)
+        return event
+
+    def since(self, kind, key, since):
+        """Изменения после версии since, склеенные в один дифф.
+
+        Если since старше хранимой истории (или неизвестна), возвращает все
+        строки с флагом reset - клиент должен заменить свои данные целиком.
+        """
+        version = self._versions.get((kind, key))
+        if version is None:
+            return None
+        result = {"league": key, "version": version, "reset": False, "changed": [], "removed": []}
+        if since is not None and since >= version:
+            return result
+
+        diffs = self._diffs.get((kind, key), ())
+        # Дифф с previous == since продолжает ровно ту версию, что у клиента
+        start = next((i for i, d in enumerate(diffs) if d["previous"] == since), None)
+        if since is None or start is None:
+            result["reset"] = True
+            result["changed"] = list(self._rows[(kind, key)].values())
+            return result
+
+        changed, removed = {}, set()
+        rows_field, id_field = self.row_sets[kind]
+        for event in list(diffs)[start:]:
+            for row in event["changed"]:
+                row_id = getattr(row, id_field)
+                changed[row_id] = row
+                removed.discard(row_id)
+            for row_id in event["removed"]:
+                changed.pop(row_id, None)
+                removed.add(row_id)
+        result["changed"] = list(changed.values())
+        result["removed"] = sorted(removed)
+        return result
+
+
+class BroadcastHub:
+    """Рассылка событий по темам всем подписчикам (SSE).
+
+    Событие кодируется один раз и кладётся в очередь каждого подписчика;
+    подписчик, не успевающий читать, отключается и переподключается сам
+    (с Last-Event-ID, догоняя пропущенное через ChangeLog).
+    """
+
+    def __init__(self, queue_size=32):
+        self.queue_size = queue_size
+        self._topics = {}
+
+    def subscribe(self, topic):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._topics.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic, queue):
+        subscribers = self._topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._topics[topic]
+
+    def subscribers(self, topic):
+        return len(self._topics.get(topic, ()))
+
+    def topics(self):
+        """Темы, у которых сейчас есть подписчики."""
+        return list(self._topics)
+
+    def publish(self, topic, event_id, data):
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return
+        message = sse_message(event_id, "diff", data)
+        for queue in list(subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # None - сигнал потоку закрыться
+                subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+def sse_message(event_id, event, data):
+    return b"".join([
+        f"id: {event_id}\nevent: {event}\ndata: ".encode(),
+        dumps(data),
+        b"\n\n",
+    ])
@@ -0,0 +1,114 @@
+import dataclasses
+import gzip
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+try:
+    import orjson
+except ImportError:  # orjson не обязателен, без него - стандартный json
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # без brotli отдаём только gzip
+    brotli = None
+
+
+def dumps(value):
+    """JSON в байты: быстрый orjson, если установлен (dataclass-записи он сериализует сам)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_plain).encode()
+
+
+def _plain(value):
+    if dataclasses.is_dataclass(value):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class EncodedSnapshot:
+    """Снимок, один раз закодированный в JSON и сжатые варианты."""
+
+    __slots__ = ("body", "gzip", "br", "etag", "last_modified", "fetched_at")
+
+    def __init__(self, value, fetched_at, body=None):
+        # body - уже готовый JSON (например, склеенный из других снимков)
+        self.body = body if body is not None else dumps(value)
+        self.gzip = gzip.compress(self.body, compresslevel=6)
+        self.br = brotli.compress(self.body, quality=9) if brotli is not None else None
+        # Слабый ETag: содержимое одно и то же в любой из кодировок
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+        self.fetched_at = fetched_at
+        self.last_modified = formatdate(fetched_at, usegmt=True)
+
+    def pick(self, accept_encoding):
+        """(байты, Content-Encoding или None) под заголовок Accept-Encoding клиента."""
+        accepted = {
+            part.split(";")[0].strip().lower()
+            for part in (accept_encoding or "").split(",")
+            if not part.strip().endswith("q=0")
+        }
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.body, None
+
+    def not_modified(self, if_none_match, if_modified_since):
+        """True, если у клиента уже есть эта версия (для ответа 304)."""
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            # Сравнение слабое: W/"x" и "x" считаются одной версией
+            return "*" in tags or self.etag in tags or self.etag[2:] in tags
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.fetched_at) <= since
+        return False
+
+
+# Пакетные ответы по нескольким лигам: склейка уже закодированных снимков,
+# запоминаем последние комбинации, чтобы не сжимать одно и то же заново
+_batches = {}
+_BATCHES_MAX = 64
+# encode_batch вызывается из потоков (asyncio.to_thread) - словарь под блокировкой
+_batches_lock = threading.Lock()
+
+
+def encode_batch(parts, errors):
+    """Ответ {"leagues": {id: снимок}, "errors": {id: текст}} из готовых EncodedSnapshot.
+
+    parts: [(id лиги, EncodedSnapshot)]. Снимки не сериализуются повторно -
+    их байты вставляются в общий JSON как есть.
+    """
+    key = (tuple((league, encoded.etag) for league, encoded in parts), tuple(sorted(errors.items())))
+    with _batches_lock:
+        batch = _batches.get(key)
+    if batch is None:
+        body = b"".join([
+            b'{"leagues":{',
+            b",".join(dumps(league) + b":" + encoded.body for league, encoded in parts),
+            b'},"errors":',
+            dumps(errors),
+            b"}",
+        ])
+        fetched_at = max((encoded.fetched_at for _, encoded in parts), default=time.time())
+        # Сжатие - вне блокировки; два потока могут собрать одну пачку, это не страшно
+        batch = EncodedSnapshot(None, fetched_at, body=body)
+        with _batches_lock:
+            if key not in _batches and len(_batches) >= _BATCHES_MAX:
+                _batches.pop(next(iter(_batches)))
+            _batches[key] = batch
+    return batch
+
+
+def cache_control(fresh_until, max_stale):
+    """Cache-Control: браузер хранит ответ до конца TTL снимка, потом перепроверяет по ETag."""
+    max_age = max(int(fresh_until - time.time()), 0)
+    return f"public, max-age={max_age}, stale-while-revalidate={int(max_stale)}"
@@ -0,0 +1,50 @@
+import bisect
+
+# Статусы football-data.org, при которых матч ещё может измениться
+LIVE_STATUSES = {"IN_PLAY", "PAUSED", "LIVE", "SUSPENDED"}
+
+
+def merge_matches(old_matches, updates):
+    """Накладывает свежие матчи на сезон по id; результат отсортирован по времени начала."""
+    merged = {match["id"]: match for match in old_matches}
+    for match in updates:
+        merged[match["id"]] = match
+    return sorted(merged.values(), key=lambda m: (m["utcDate"], m["id"]))
+
+
+class MatchIndex:
+    """Матчи лиги, отсортированные по времени начала, с индексом по командам.
+
+    Диапазон дат - бинарный поиск по отсортированному списку, матчи
+    команды - готовый список позиций (тоже по возрастанию времени).
+    """
+
+    def __init__(self, matches, version):
+        self.version = version
+        self.matches = sorted(matches, key=lambda m: (m["utcDate"], m["id"]))
+        # utcDate в ISO 8601 (UTC) - строки сравниваются так же, как даты
+        self.dates = [match["utcDate"] for match in self.matches]
+        self.by_team = {}
+        for position, match in enumerate(self.matches):
+            for side in ("homeTeam", "awayTeam"):
+                team_id = match[side]["id"]
+                if team_id is not None:
+                    self.by_team.setdefault(team_id, []).append(position)
+
+    def query(self, team_id=None, date_from=None, date_to=None, statuses=None):
+        """Матчи в [date_from, date_to] (префиксы ISO: "2025-05-01" или полная дата-время)."""
+        lo = bisect.bisect_left(self.dates, date_from) if date_from else 0
+        # "\uffff" - чтобы "2025-05-01" включал все матчи этого дня
+        hi = bisect.bisect_right(self.dates, date_to + "\uffff") if date_to else len(self.dates)
+
+        if team_id is not None:
+            positions = self.by_team.get(team_id, [])
+            start = bisect.bisect_left(positions, lo)
+            end = bisect.bisect_left(positions, hi)
+            found = [self.matches[i] for i in positions[start:end]]
+        else:
+            found = self.matches[lo:hi]
+
+        if statuses:
+            found = [match for match in found if match["status"] in statuses]
+        return found
@@ -0,0 +1,212 @@
+import base64
+import hashlib
+import unicodedata
+
+SORT_FIELDS = ("name", "age", "team", "position", "nationality", "league", "goals", "assists", "goalsAssists")
+# Числовые поля: при равенстве порядок по имени
+NUMERIC_FIELDS = {"age", "goals", "assists", "goalsAssists"}
+
+# Буквы, которые NFKD не раскладывает на базовую букву и диакритику
+_EXTRA_FOLDS = str.maketrans({"ø": "o", "Ø": "O", "ł": "l", "Ł": "L", "đ": "d", "Đ": "D", "ß": "ss", "æ": "ae", "Æ": "AE"})
+
+
+def fold(text):
+    """Нормализует строку для поиска: без диакритики и регистра ("Ødegaard" -> "odegaard")."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.translate(_EXTRA_FOLDS).casefold()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CursorError(ValueError):
+    pass
+
+
+def index_version(snapshots):
+    """Версия индекса по времени загрузки снимков: {лига: (fetched_at, ...)}.
+
+    Одинакова во всех воркерах (в отличие от hash() строк), поэтому курсор,
+    выданный одним воркером, принимают и остальные.
+    """
+    key = ";".join(
+        league + ":" + ",".join(str(int(t * 1000)) if t is not None else "-" for t in times)
+        for league, times in sorted(snapshots.items())
+    )
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=4).digest(), "big")
+
+
+class PlayerIndex:
+    """Индексы по игрокам всех загруженных лиг, строятся один раз на снимок.
+
+    Фильтры по полям - хеш-индексы (значение -> множество строк), поиск по
+    имени - триграммный индекс по нормализованным именам (команда и гражданство
+    ищутся по ключам своих хеш-индексов), сортировки
+    заранее посчитаны, пагинация - курсор по позиции в сортировке.
+    """
+
+    def __init__(self, players_by_league, version):
+        # players_by_league: {competition_id: список игроков со статистикой (PlayerStats.players)}
+        self.version = version
+        # Записи PlayerLine общие со статистикой лиги - индекс их не копирует
+        self.rows = []
+        for players in players_by_league.values():
+            self.rows.extend(players)
+
+        self.by_field = {
+            "league": {},
+            "teamId": {},
+            "team": {},
+            "position": {},
+            "nationality": {},
+        }
+        self.names = []
+        self.trigrams = {}
+        for i, row in enumerate(self.rows):
+            for field, index in self.by_field.items():
+                value = getattr(row, field)
+                if value is not None:
+                    index.setdefault(_key(value), set()).add(i)
+            name = fold(row.name)
+            self.names.append(name)
+            for gram in _trigrams(name):
+                self.trigrams.setdefault(gram, set()).add(i)
+
+        # Порядок строк для каждой сортировки ("age" и "-age" - отдельно, чтобы пустые
+        # значения были в конце в обоих направлениях) и ранг строки в этом порядке
+        self.orders = {}
+        self.ranks = {}
+        for field in SORT_FIELDS:
+            for sort, descending in ((field, False), ("-" + field, True)):
+                order = sorted(
+                    range(len(self.rows)),
+                    key=lambda i: _sort_key(self.rows[i], field, descending),
+                    reverse=descending,
+                )
+                self.orders[sort] = order
+                rank = [0] * len(order)
+                for position, i in enumerate(order):
+                    rank[i] = position
+                self.ranks[sort] = rank
+
+    def _match_text(self, q):
+        """Строки, у которых q входит в имя, команду или гражданство."""
+        q = fold(q).strip()
+        if not q:
+            return None
+        found = self._match_name(q)
+        # Разных команд и гражданств сотни - их ключи проверяются перебором
+        for field in ("team", "nationality"):
+            for value, ids in self.by_field[field].items():
+                if q in value:
+                    found |= ids
+        return found
+
+    def _match_name(self, q):
+        if len(q) < 3:
+            pool = range(len(self.rows))
+        else:
+            # Кандидаты - пересечение строк со всеми триграммами запроса,
+            # начиная с самой редкой; затем точная проверка подстрокой
+            pool = None
+            for gram in sorted(_trigrams(q), key=lambda g: len(self.trigrams.get(g, ()))):
+                ids = self.trigrams.get(gram)
+                if not ids:
+                    return set()
+                pool = ids if pool is None else pool & ids
+                if not pool:
+                    return set()
+        return {i for i in pool if q in self.names[i]}
+
+    def query(self, filters=None, q=None, age_min=None, age_max=None,
+              sort="name", cursor=None, limit=50):
+        """Возвращает страницу игроков: {"total", "items", "nextCursor"}."""
+        if sort not in self.orders:
+            raise ValueError(f"unknown sort field {sort.lstrip('-')!r}")
+
+        candidates = None
+        for name, value in (filters or {}).items():
+            if value is None:
+                continue
+            ids = self.by_field[name].get(_key(value), set())
+            candidates = ids if candidates is None else candidates & ids
+        if q:
+            ids = self._match_text(q)
+            if ids is not None:
+                candidates = ids if candidates is None else candidates & ids
+        if age_min is not None or age_max is not None:
+            lo = age_min if age_min is not None else 0
+            hi = age_max if age_max is not None else 200
+            pool = candidates if candidates is not None else range(len(self.rows))
+            # Игрок с неизвестным возрастом не попадает ни в какой диапазон
+            candidates = {
+                i for i in pool
+                if self.rows[i].age is not None and lo <= self.rows[i].age <= hi
+            }
+
+        rank = self.ranks[sort]
+        if candidates is None:
+            ordered = self.orders[sort]
+        else:
+            ordered = sorted(candidates, key=rank.__getitem__)
+
+        start = 0
+        if cursor:
+            last_rank = self._decode_cursor(cursor, sort)
+            # Страница начинается после последней выданной строки
+            start = _bisect_rank(ordered, rank, last_rank)
+
+        page = ordered[start:start + limit]
+        next_cursor = None
+        if start + limit < len(ordered):
+            next_cursor = self._encode_cursor(sort, rank[page[-1]])
+
+        return {
+            "total": len(ordered),
+            "items": [self.rows[i] for i in page],
+            "nextCursor": next_cursor,
+        }
+
+    def _encode_cursor(self, sort, last_rank):
+        raw = f"{self.version}|{sort}|{last_rank}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor, sort):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            version, cursor_sort, last_rank = raw.split("|")
+            last_rank = int(last_rank)
+        except ValueError:
+            raise CursorError("malformed cursor")
+        if version != str(self.version) or cursor_sort != sort:
+            raise CursorError("cursor expired, restart from the first page")
+        return last_rank
+
+
+def _key(value):
+    return fold(value) if isinstance(value, str) else value
+
+
+def _sort_key(row, field, descending=False):
+    value = getattr(row, field)
+    # Пустые значения - в конце; при reverse=True признак пустоты инвертируется
+    missing = (value is None) != descending
+    if field in NUMERIC_FIELDS:
+        return (missing, value or 0, fold(row.name))
+    return (missing, fold(value) if isinstance(value, str) else value or "", row.id)
+
+
+def _bisect_rank(ordered, rank, last_rank):
+    # ordered идёт по возрастанию ранга: ищем первую строку после last_rank
+    lo, hi = 0, len(ordered)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if rank[ordered[mid]] <= last_rank:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
@@ -0,0 +1,99 @@
+from encoding import EncodedSnapshot
+from player_index import fold
+from records import PlayerLine
+
+# Лидерборды игроков - по одному на поле статистики
+BOARDS = ("goals", "assists", "goalsAssists")
+
+
+def board_key(field):
+    """Ключ сортировки лидерборда: больше - выше, при равенстве больше голов, затем по имени."""
+    return lambda row: (-getattr(row, field), -row.goals, fold(row.name), row.id)
+
+
+def enrich_players(players, scorers, league):
+    """Присоединяет статистику бомбардиров к составам одним хеш-join по id игрока.
+
+    Игроки, которых нет в списке бомбардиров, получают нули; playedMatches
+    известен только для игроков из списка.
+    """
+    by_id = {row["player"]["id"]: row for row in scorers}
+    enriched = []
+    for player in players:
+        row = by_id.get(player.id)
+        goals = (row["goals"] or 0) if row else 0
+        assists = (row["assists"] or 0) if row else 0
+        enriched.append(PlayerLine.from_record(
+            player,
+            league=league,
+            goals=goals,
+            assists=assists,
+            goalsAssists=goals + assists,
+            penalties=(row["penalties"] or 0) if row else 0,
+            playedMatches=row.get("playedMatches") if row else None,
+        ))
+    return enriched
+
+
+class PlayerStats:
+    """Обогащённые игроки лиги и лидерборды, строятся один раз на пару снимков
+    (составы, бомбардиры) - обработчики запросов только режут готовые списки.
+    """
+
+    def __init__(self, league, players, scorers, version, fetched_at, fresh_until, stale_until):
+        # players, scorers - значения снимков "players" и "scorers" (scorers может быть None)
+        self.league = league
+        self.version = version
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.players = enrich_players(players["players"], scorers["scorers"] if scorers else [], league)
+
+        ranked = [row for row in self.players if row.goalsAssists > 0]
+        self.boards = {
+            field: sorted((row for row in ranked if getattr(row, field) > 0), key=board_key(field))
+            for field in BOARDS
+        }
+        self.by_team = {}
+        for field, rows in self.boards.items():
+            for row in rows:
+                team = self.by_team.setdefault(row.teamId, {board: [] for board in BOARDS})
+                team[field].append(row)
+
+        totals = {}
+        for row in self.players:
+            team = totals.get(row.teamId)
+            if team is None:
+                team = totals[row.teamId] = {
+                    "teamId": row.teamId, "team": row.team, "league": league,
+                    "goals": 0, "assists": 0, "goalsAssists": 0, "topScorer": None,
+                }
+            team["goals"] += row.goals
+            team["assists"] += row.assists
+            team["goalsAssists"] += row.goalsAssists
+        for team_id, team in totals.items():
+            scorers_of_team = self.by_team.get(team_id, {}).get("goals")
+            if scorers_of_team:
+                team["topScorer"] = scorers_of_team[0].name
+        self.teams = sorted(totals.values(), key=team_key)
+
+        # Обогащённый состав целиком отдаётся готовыми байтами, как снимки кэша
+        self.encoded = EncodedSnapshot(
+            {"competition": players["competition"], "season": players["season"], "players": self.players},
+            fetched_at,
+        )
+
+    def leaders(self, limit=10, team_id=None):
+        """Первые limit игроков каждого лидерборда и суммарная статистика команд."""
+        if team_id is None:
+            boards = self.boards
+            teams = self.teams
+        else:
+            boards = self.by_team.get(team_id, {board: [] for board in BOARDS})
+            teams = [team for team in self.teams if team["teamId"] == team_id]
+        result = {field: boards[field][:limit] for field in BOARDS}
+        result["teams"] = teams
+        return result
+
+
+def team_key(team):
+    return (-team["goalsAssists"], -team["goals"], fold(team["team"]), team["teamId"])
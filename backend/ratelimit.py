@@ -0,0 +1,114 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+def _number(value, kind):
+    if value is None:
+        return None
+    try:
+        return kind(value)
+    except ValueError:
+        return None
+
+
+class QuotaLimiter:
+    """Token bucket, синхронизируемый с квотой football-data.org.
+
+    Локально расходует токены при каждом запросе, а по заголовкам ответа
+    (X-Requests-Available-Minute, X-RequestCounter-Reset) подстраивается
+    под фактический остаток квоты на сервере.
+
+    Квота одна на API-ключ, поэтому с store (SnapshotStore) остаток и время
+    сброса окна хранятся в общей базе и меняются в транзакции - воркеры
+    uvicorn на хосте делят одну квоту, а не расходуют каждый свою.
+    """
+
+    def __init__(self, capacity=10, window=60.0, max_concurrency=5, store=None, name="upstream"):
+        self.capacity = capacity
+        self.window = window
+        self.store = store
+        self.name = name
+        self.tokens = capacity
+        self.reset_at = self._now() + window
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _now(self):
+        # Общий счётчик видят разные процессы - время в нём абсолютное
+        return time.monotonic() if self.store is None else time.time()
+
+    async def _update(self, step):
+        """Применяет step(tokens, reset_at, now) -> (tokens, reset_at, result) к счётчику."""
+        if self.store is None:
+            # Без await между чтением и записью - в одном event loop это атомарно
+            self.tokens, self.reset_at, result = step(self.tokens, self.reset_at, self._now())
+            return result
+
+        def apply(state):
+            now = self._now()
+            tokens, reset_at = state if state is not None else (self.capacity, now + self.window)
+            return step(tokens, reset_at, now)
+
+        # Локальные tokens/reset_at - копия для метрик
+        self.tokens, self.reset_at, result = await asyncio.to_thread(self.store.update_quota, self.name, apply)
+        return result
+
+    def _refill(self, tokens, reset_at, now):
+        if now >= reset_at:
+            return self.capacity, now + self.window
+        return tokens, reset_at
+
+    async def acquire(self, reserve=0):
+        """Ждёт свободный токен.
+
+        reserve - сколько токенов оставить нетронутыми для более важных
+        запросов (фоновые задачи не забирают последние токены окна).
+        """
+        def take(tokens, reset_at, now):
+            tokens, reset_at = self._refill(tokens, reset_at, now)
+            if tokens > reserve:
+                return tokens - 1, reset_at, None
+            return tokens, reset_at, max(reset_at - now, 0.05)
+
+        # Ожидание не блокирует более важные запросы: каждый шаг заново сверяется с остатком
+        while True:
+            wait = await self._update(take)
+            if wait is None:
+                return
+            await asyncio.sleep(wait)
+
+    async def update_from_headers(self, headers):
+        """Применяет заголовки квоты из ответа upstream."""
+        available = _number(headers.get("X-Requests-Available-Minute"), int)
+        reset = _number(headers.get("X-RequestCounter-Reset"), float)
+        if available is None and reset is None:
+            return
+
+        def update(tokens, reset_at, now):
+            if reset is not None:
+                reset_at = now + reset
+            if available is not None:
+                # Сервер знает точный остаток; локальный счётчик может только уменьшиться,
+                # т.к. ответы на уже отправленные запросы ещё в пути.
+                tokens = min(tokens, available)
+            return tokens, reset_at, None
+
+        await self._update(update)
+
+    async def exhaust(self, retry_after=None):
+        """Квота исчерпана (429): не выпускаем запросы до сброса окна."""
+        delay = _number(retry_after, float)
+        if delay is None:
+            delay = self.window
+        await self._update(lambda tokens, reset_at, now: (0, max(reset_at, now + delay), None))
+
+    @asynccontextmanager
+    async def slot(self, reserve=0):
+        """Слот для одного запроса: ограничивает параллелизм и расход квоты.
+
+        Токен берётся до семафора: фоновые задачи, ждущие сброса окна,
+        не занимают слоты, нужные запросам с меньшим reserve.
+        """
+        await self.acquire(reserve)
+        async with self._semaphore:
+            yield
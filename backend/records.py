@@ -0,0 +1,108 @@
+import sys
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+
+# Записи снимков в памяти: слоты вместо словаря на каждую строку, повторяющиеся
+# строки (команда, позиция, гражданство) интернированы и хранятся один раз.
+# orjson сериализует такие dataclass сам - без промежуточных словарей.
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def age_on(date_of_birth, today):
+    """Полных лет на дату today; None, если дата рождения неизвестна или некорректна."""
+    try:
+        born = date.fromisoformat(date_of_birth[:10])
+    except (TypeError, ValueError):
+        return None
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+@dataclass(slots=True)
+class PlayerRecord:
+    id: int
+    name: str
+    position: str
+    nationality: str
+    dateOfBirth: Optional[str]
+    team: str
+    teamId: int
+    shirtNumber: Optional[int]
+    role: str
+    age: Optional[int]
+
+    @classmethod
+    def from_json(cls, row, today):
+        """Игрок из словаря (ответ upstream после нормализации или снимок с диска).
+
+        Возраст всегда пересчитывается на today, а не берётся из словаря.
+        """
+        return cls(
+            id=row["id"],
+            name=row["name"],
+            position=intern_text(row.get("position") or "Unknown"),
+            nationality=intern_text(row.get("nationality") or "Unknown"),
+            dateOfBirth=row.get("dateOfBirth"),
+            team=intern_text(row["team"]),
+            teamId=row["teamId"],
+            shirtNumber=row.get("shirtNumber"),
+            role=intern_text(row.get("role") or "PLAYER"),
+            age=age_on(row.get("dateOfBirth"), today),
+        )
+
+
+@dataclass(slots=True)
+class PlayerLine(PlayerRecord):
+    """Игрок со статистикой бомбардиров (см. player_stats)."""
+
+    league: str
+    goals: int
+    assists: int
+    goalsAssists: int
+    penalties: int
+    playedMatches: Optional[int]
+
+    @classmethod
+    def from_record(cls, player, **stats):
+        # Поля игрока переносятся ссылками: строки не копируются
+        return cls(*(getattr(player, name) for name in PlayerRecord.__slots__), **stats)
+
+
+@dataclass(slots=True)
+class StandingRow:
+    id: int
+    position: int
+    name: str
+    shortName: str
+    points: int
+    goalsFor: int
+    goalsAgainst: int
+    goalDifference: int
+    crest: str
+    played: int
+    won: int
+    drawn: int
+    lost: int
+
+    @classmethod
+    def from_json(cls, row):
+        return cls(**{
+            **row,
+            "name": intern_text(row["name"]),
+            "shortName": intern_text(row["shortName"]),
+            "crest": intern_text(row["crest"]),
+        })
+
+
+def players_from_json(value, today=None):
+    """Снимок "players" со словарями строк -> снимок с PlayerRecord."""
+    today = today or date.today()
+    return {**value, "players": [PlayerRecord.from_json(row, today) for row in value["players"]]}
+
+
+def standings_from_json(value):
+    """Снимок "standings" со словарями строк -> снимок с StandingRow."""
+    return {**value, "table": [StandingRow.from_json(row) for row in value["table"]]}
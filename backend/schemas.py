@@ -1,7 +1,8 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List
 
 class Team(BaseModel):
+    id: int
     position: int
     name: str
     shortName: str
@@ -19,4 +20,8 @@ class Team(BaseModel):
 class StandingsResponse(BaseModel):
     competition: str
     season: str
-    table: List[Team]
\ No newline at end of file
+    table: List[Team]
+
+class StandingsBatchResponse(BaseModel):
+    leagues: Dict[str, StandingsResponse]
+    errors: Dict[str, str]
@@ -1,23 +1,17 @@
-import os
-import requests
-from dotenv import load_dotenv
-import httpx # Импортируем httpx
-import asyncio # Импортируем asyncio
-import time # Добавляем time для задержек
+import logging
+from datetime import date
 
-load_dotenv()
+import asyncio # Импортируем asyncio
+from records import PlayerRecord, StandingRow, intern_text
+# Все запросы идут через общий клиент с квотой, повторами и circuit breaker
+from upstream import fetch_json
 
-API_BASE_URL = "https://api.football-data.org/v4"
-HEADERS = {"X-Auth-Token": os.getenv("API_KEY")}
+logger = logging.getLogger(__name__)
 
 
-# --- Существующие функции (без изменений) ---
-def fetch_standings_normalized(competition_id="PL"):
-    # ... (код без изменений)
-    api_url = f"{API_BASE_URL}/competitions/{competition_id}/standings"
-    r = requests.get(api_url, headers=HEADERS, timeout=10)
-    r.raise_for_status()
-    data = r.json()
+# --- Таблицы и бомбардиры ---
+async def fetch_standings_normalized(competition_id="PL"):
+    data = await fetch_json(f"/competitions/{competition_id}/standings", timeout=10)
 
     season = data["season"]["startDate"][:4]
     table_src = data["standings"][0]["table"]
@@ -25,20 +19,21 @@ def fetch_standings_normalized(competition_id="PL"):
     table = []
     for row in table_src:
         team = row["team"]
-        table.append({
-            "position": row["position"],
-            "name": team["name"],
-            "shortName": team["shortName"],
-            "points": row["points"],
-            "goalsFor": row["goalsFor"],
-            "goalsAgainst": row["goalsAgainst"],
-            "goalDifference": row["goalDifference"],
-            "crest": team["crest"],
-            "played": row["playedGames"],
-            "won": row["won"],
-            "drawn": row["draw"],
-            "lost": row["lost"],
-        })
+        table.append(StandingRow(
+            id=team["id"],
+            position=row["position"],
+            name=intern_text(team["name"]),
+            shortName=intern_text(team["shortName"]),
+            points=row["points"],
+            goalsFor=row["goalsFor"],
+            goalsAgainst=row["goalsAgainst"],
+            goalDifference=row["goalDifference"],
+            crest=intern_text(team["crest"]),
+            played=row["playedGames"],
+            won=row["won"],
+            drawn=row["draw"],
+            lost=row["lost"],
+        ))
 
     return {
         "competition": data["competition"]["name"],
@@ -47,12 +42,10 @@ def fetch_standings_normalized(competition_id="PL"):
     }
 
 
-def fetch_top_scorers(competition_id="PL"):
-    # ... (код без изменений)
-    api_url = f"{API_BASE_URL}/competitions/{competition_id}/scorers?limit=20"
-    r = requests.get(api_url, headers=HEADERS, timeout=10)
-    r.raise_for_status()
-    data = r.json()
+async def fetch_top_scorers(competition_id="PL", limit=20, reserve=0):
+    data = await fetch_json(
+        f"/competitions/{competition_id}/scorers", params={"limit": limit}, reserve=reserve, timeout=10
+    )
 
     season = data["season"]["startDate"][:4]
     scorers_src = data["scorers"]
@@ -77,6 +70,7 @@ def fetch_top_scorers(competition_id="PL"):
             "goals": row["goals"],
             "assists": row.get("assists"),
             "penalties": row.get("penalties"),
+            "playedMatches": row.get("playedMatches"),
         })
 
     return {
@@ -86,169 +80,141 @@ def fetch_top_scorers(competition_id="PL"):
     }
 
 
-# --- Новая асинхронная функция для получения всех составов ---
+# --- Матчи сезона ---
 
-async def fetch_team_squad(team_id: int, client: httpx.AsyncClient):
-    """Асинхронно получает состав одной команды."""
-    api_url = f"{API_BASE_URL}/teams/{team_id}"
-    try:
-        response = await client.get(api_url, headers=HEADERS, timeout=20)
-        response.raise_for_status()
-        data = response.json()
-        
-        squad = []
-        for player in data.get("squad", []):
-            squad.append({
-                "id": player["id"],
-                "name": player["name"],
-                "position": player.get("position"),
-                "dateOfBirth": player.get("dateOfBirth"),
-                "nationality": player.get("nationality")
-            })
-            
-        return {
-            "id": data["id"],
-            "name": data["name"],
-            "shortName": data["shortName"],
-            "crest": data["crest"],
-            "squad": squad,
+def _normalize_match(match):
+    score = match.get("score") or {}
+    full_time = score.get("fullTime") or {}
+    teams = {}
+    for side in ("homeTeam", "awayTeam"):
+        team = match.get(side) or {}
+        teams[side] = {
+            "id": team.get("id"),
+            "name": team.get("name"),
+            "shortName": team.get("shortName"),
+            "crest": team.get("crest"),
         }
-    except httpx.HTTPStatusError as e:
-        print(f"Error fetching team {team_id}: {e}")
-        return None
-
-
-async def fetch_squads_for_competition(competition_id="PL"):
-    """Получает все команды лиги и асинхронно запрашивает состав каждой."""
-    # 1. Получаем список команд (синхронно, так как это всего один запрос)
-    standings_url = f"{API_BASE_URL}/competitions/{competition_id}/standings"
-    r = requests.get(standings_url, headers=HEADERS, timeout=10)
-    r.raise_for_status()
-    standings_data = r.json()
-
-    team_ids = [row["team"]["id"] for row in standings_data["standings"][0]["table"]]
-    
-    # 2. Асинхронно получаем составы всех команд
-    async with httpx.AsyncClient() as client:
-        tasks = [fetch_team_squad(team_id, client) for team_id in team_ids]
-        teams_with_squads = await asyncio.gather(*tasks)
+    return {
+        "id": match["id"],
+        "utcDate": match["utcDate"],
+        "status": match["status"],
+        "matchday": match.get("matchday"),
+        "stage": match.get("stage"),
+        "venue": match.get("venue"),
+        "homeTeam": teams["homeTeam"],
+        "awayTeam": teams["awayTeam"],
+        "homeScore": full_time.get("home"),
+        "awayScore": full_time.get("away"),
+        "winner": score.get("winner"),
+        "lastUpdated": match.get("lastUpdated"),
+    }
+
+
+async def fetch_matches(competition_id="PL", date_from=None, date_to=None, reserve=0):
+    """Матчи лиги: весь сезон одним запросом или только окно дат (YYYY-MM-DD)."""
+    params = {}
+    if date_from is not None:
+        params["dateFrom"] = date_from
+    if date_to is not None:
+        params["dateTo"] = date_to
+    data = await fetch_json(f"/competitions/{competition_id}/matches", params=params or None, reserve=reserve)
 
-    # Фильтруем команды, для которых не удалось получить данные
-    valid_teams = [team for team in teams_with_squads if team is not None]
+    season = (data.get("resultSet") or {}).get("first") or ""
+    if data.get("matches"):
+        season = data["matches"][0].get("season", {}).get("startDate", season)
 
     return {
-        "competition": standings_data["competition"]["name"],
-        "season": standings_data["season"]["startDate"][:4],
-        "teams": valid_teams,
+        "competition": data["competition"]["name"],
+        "season": season[:4],
+        "matches": [_normalize_match(match) for match in data.get("matches", [])],
     }
 
 
-def get_players_by_competition(competition_id="PL"):
-    """Получает всех игроков из команд лиги с реальными данными."""
+# --- Асинхронный сбор составов с учётом квоты API ---
+
+class IncompleteSquadsError(Exception):
+    """Состав хотя бы одной команды не получен - неполный снимок не сохраняется."""
+
+
+async def fetch_team_squad(team_id: int, reserve=0):
+    """Асинхронно получает состав одной команды."""
     try:
-        print(f"🔍 Начинаем парсинг реальных данных игроков для лиги {competition_id}")
-        
-        # 1. Получаем команды лиги
-        standings_url = f"{API_BASE_URL}/competitions/{competition_id}/standings"
-        r = requests.get(standings_url, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        standings_data = r.json()
-        
-        teams = standings_data["standings"][0]["table"]
-        all_players = []
-        
-        print(f"🔍 Найдено команд в лиге: {len(teams)}")
-        
-        # 2. Для каждой команды получаем реальных игроков с задержками
-        for i, team_data in enumerate(teams):
-            team_id = team_data["team"]["id"]
-            team_name = team_data["team"]["name"]
-            
-            # Добавляем задержку между запросами для избежания 429 ошибок
-            if i > 0:
-                print(f"⏳ Ожидание 3 секунды перед запросом к {team_name}...")
-                time.sleep(3)
-            
-            try:
-                # Получаем состав команды
-                team_url = f"{API_BASE_URL}/teams/{team_id}"
-                print(f"🔄 Запрашиваем игроков команды {team_name}...")
-                team_response = requests.get(team_url, headers=HEADERS, timeout=15)
-                team_response.raise_for_status()
-                team_info = team_response.json()
-                
-                # Извлекаем игроков из состава
-                squad = team_info.get("squad", [])
-                print(f"✅ Найдено {len(squad)} игроков в команде {team_name}")
-                
-                for player in squad:
-                    # Вычисляем возраст
-                    age = None
-                    if player.get("dateOfBirth"):
-                        birth_year = int(player["dateOfBirth"][:4])
-                        age = 2024 - birth_year
-                    
-                    all_players.append({
-                        "id": player["id"],
-                        "name": player["name"],
-                        "position": player.get("position", "Unknown"),
-                        "nationality": player.get("nationality", "Unknown"),
-                        "dateOfBirth": player.get("dateOfBirth", "1990-01-01"),
-                        "team": team_name,
-                        "teamId": team_id,
-                        "shirtNumber": player.get("shirtNumber"),
-                        "role": player.get("role", "PLAYER"),
-                        "age": age or 25
-                    })
-                    
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 429:
-                    print(f"⚠️ Превышен лимит запросов для {team_name}. Ожидание 15 секунд...")
-                    time.sleep(15)
-                    # Повторная попытка
-                    try:
-                        team_response = requests.get(team_url, headers=HEADERS, timeout=15)
-                        team_response.raise_for_status()
-                        team_info = team_response.json()
-                        squad = team_info.get("squad", [])
-                        print(f"✅ Повторный запрос успешен: {len(squad)} игроков в команде {team_name}")
-                        
-                        for player in squad:
-                            age = None
-                            if player.get("dateOfBirth"):
-                                birth_year = int(player["dateOfBirth"][:4])
-                                age = 2024 - birth_year
-                            
-                            all_players.append({
-                                "id": player["id"],
-                                "name": player["name"],
-                                "position": player.get("position", "Unknown"),
-                                "nationality": player.get("nationality", "Unknown"),
-                                "dateOfBirth": player.get("dateOfBirth", "1990-01-01"),
-                                "team": team_name,
-                                "teamId": team_id,
-                                "shirtNumber": player.get("shirtNumber"),
-                                "role": player.get("role", "PLAYER"),
-                                "age": age or 25
-                            })
-                    except Exception as retry_e:
-                        print(f"❌ Повторная попытка не удалась для {team_name}: {retry_e}")
-                        continue
-                else:
-                    print(f"❌ Ошибка при получении игроков команды {team_name}: {e}")
-                    continue
-            except Exception as e:
-                print(f"❌ Ошибка при получении игроков команды {team_name}: {e}")
-                continue
-        
-        print(f"🎯 Всего реальных игроков получено: {len(all_players)}")
-        
-        return {
-            "competition": standings_data["competition"]["name"],
-            "season": standings_data["season"]["startDate"][:4],
-            "players": all_players
-        }
-        
+        data = await fetch_json(f"/teams/{team_id}", reserve=reserve)
     except Exception as e:
-        print(f"❌ Ошибка при получении игроков: {e}")
-        raise
\ No newline at end of file
+        logger.warning("Не удалось получить состав команды: %s", e, extra={"teamId": team_id})
+        raise
+
+    squad = []
+    for player in data.get("squad", []):
+        squad.append({
+            "id": player["id"],
+            "name": player["name"],
+            "position": player.get("position"),
+            "dateOfBirth": player.get("dateOfBirth"),
+            "nationality": player.get("nationality"),
+            "shirtNumber": player.get("shirtNumber"),
+            "role": player.get("role"),
+        })
+
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "shortName": data["shortName"],
+        "crest": data["crest"],
+        "squad": squad,
+    }
+
+
+async def fetch_squads_for_competition(competition_id="PL", reserve=0, standings=None):
+    """Получает все команды лиги и параллельно (в пределах квоты) запрашивает составы.
+
+    standings - уже загруженный снимок таблицы лиги (fetch_standings_normalized);
+    без него таблица запрашивается отдельно.
+    """
+    # 1. Список команд берём из таблицы лиги
+    if standings is None:
+        standings = await fetch_standings_normalized(competition_id)
+    team_ids = [row.id for row in standings["table"]]
+
+    # 2. Составы запрашиваются параллельно, темп задаёт лимитер квоты
+    tasks = [asyncio.ensure_future(fetch_team_squad(team_id, reserve)) for team_id in team_ids]
+    try:
+        teams_with_squads = await asyncio.gather(*tasks)
+    except Exception as e:
+        # Снимок без части команд хуже старого полного: кэш оставит прежний,
+        # а оставшиеся запросы не тратят квоту зря
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise IncompleteSquadsError(f"squads incomplete for {competition_id}: {e}") from e
+
+    return {
+        "competition": standings["competition"],
+        "season": standings["season"],
+        "teams": teams_with_squads,
+    }
+
+
+async def get_players_by_competition(competition_id="PL", reserve=0, standings=None):
+    """Получает всех игроков из команд лиги с реальными данными."""
+    data = await fetch_squads_for_competition(competition_id, reserve, standings)
+
+    # Возраст считается один раз на снимок - по сегодняшней дате
+    today = date.today()
+    all_players = []
+    for team in data["teams"]:
+        for player in team["squad"]:
+            all_players.append(PlayerRecord.from_json(
+                {**player, "team": team["name"], "teamId": team["id"]}, today
+            ))
+
+    logger.info(
+        "Составы лиги получены",
+        extra={"league": competition_id, "teams": len(data["teams"]), "players": len(all_players)},
+    )
+
+    return {
+        "competition": data["competition"],
+        "season": data["season"],
+        "players": all_players
+    }
@@ -0,0 +1,360 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import date, timedelta
+from functools import partial
+
+from cache import SnapshotCache
+from changes import BroadcastHub, ChangeLog
+from encoding import EncodedSnapshot
+from match_index import LIVE_STATUSES, MatchIndex, merge_matches
+from metrics import Collected, registry
+from player_index import PlayerIndex, index_version
+from player_stats import PlayerStats
+from records import players_from_json, standings_from_json
+from schemas import StandingsResponse
+from service import (
+    fetch_matches,
+    fetch_standings_normalized,
+    fetch_top_scorers,
+    get_players_by_competition,
+)
+from store import SnapshotStore
+import upstream
+from warmer import LeagueWarmer
+
+logger = logging.getLogger(__name__)
+
+LEAGUES = ["PL", "PD", "BL1", "SA", "FL1"]
+
+# Адреса лиг во фронтенде -> id соревнования в football-data.org
+LEAGUE_SLUGS = {
+    "premier-league": "PL",
+    "la-liga": "PD",
+    "bundesliga": "BL1",
+    "serie-a": "SA",
+    "ligue-1": "FL1",
+}
+
+# Идентификатор воркера для межпроцессных блокировок в общем store
+HOLDER = f"{socket.gethostname()}:{os.getpid()}"
+
+# Сколько токенов минутной квоты фоновые загрузки (составы, матчи, бомбардиры) оставляют таблицам
+RESERVED_FOR_STANDINGS = int(os.getenv("RESERVED_FOR_STANDINGS", "2"))
+
+# TTL (сек) и окно stale-while-revalidate для каждого вида данных
+POLICIES = {
+    "standings": (
+        int(os.getenv("STANDINGS_TTL", "300")),
+        int(os.getenv("STANDINGS_MAX_STALE", "3600")),
+    ),
+    "players": (
+        int(os.getenv("PLAYERS_TTL", "21600")),
+        int(os.getenv("PLAYERS_MAX_STALE", "86400")),
+    ),
+    "scorers": (
+        int(os.getenv("SCORERS_TTL", "3600")),
+        int(os.getenv("SCORERS_MAX_STALE", "86400")),
+    ),
+    "matches": (
+        int(os.getenv("MATCHES_TTL", "300")),
+        int(os.getenv("MATCHES_MAX_STALE", "86400")),
+    ),
+}
+
+# Как часто перекачивать сезон целиком; между полными загрузками
+# запрашиваются только матчи в окне вокруг сегодняшнего дня
+MATCHES_FULL_EVERY = int(os.getenv("MATCHES_FULL_EVERY", "21600"))
+MATCHES_WINDOW_DAYS = int(os.getenv("MATCHES_WINDOW_DAYS", "2"))
+
+# Бомбардиров берём с запасом: по ним обогащаются составы и строятся лидерборды
+SCORERS_LIMIT = int(os.getenv("SCORERS_LIMIT", "100"))
+_load_scorers = partial(fetch_top_scorers, limit=SCORERS_LIMIT)
+
+
+async def _load_matches(competition_id, reserve=0):
+    """Сезон лиги: полная загрузка раз в MATCHES_FULL_EVERY, иначе только свежее окно."""
+    entry = await cache.peek("matches", competition_id)
+    previous = entry.value if entry is not None else None
+    if previous is None or time.time() - previous["fullFetchedAt"] >= MATCHES_FULL_EVERY:
+        season = await fetch_matches(competition_id, reserve=reserve)
+        season["fullFetchedAt"] = time.time()
+        return season
+
+    # Идущие и недавно сыгранные матчи попадают в окно; незавершённые матчи
+    # вне окна (перенесённые, прерванные) перезапрашиваем по их датам
+    today = date.today()
+    date_from = today - timedelta(days=MATCHES_WINDOW_DAYS)
+    date_to = today + timedelta(days=1)
+    stale_live = [
+        m["utcDate"][:10] for m in previous["matches"]
+        if m["status"] in LIVE_STATUSES and m["utcDate"][:10] < date_from.isoformat()
+    ]
+    if stale_live:
+        date_from = date.fromisoformat(min(stale_live))
+    window = await fetch_matches(competition_id, date_from.isoformat(), date_to.isoformat(), reserve=reserve)
+    return {
+        **previous,
+        "matches": merge_matches(previous["matches"], window["matches"]),
+    }
+
+
+async def _load_players(competition_id, reserve=0):
+    """Составы лиги; список команд берётся из таблицы в кэше, если она уже есть.
+
+    Состав лиги за сезон не меняется, поэтому подойдёт и устаревшая таблица -
+    лишний запрос таблицы при каждом сборе составов не тратит квоту.
+    """
+    entry = await cache.peek("standings", competition_id)
+    standings = entry.value if entry is not None else None
+    return await get_players_by_competition(competition_id, reserve=reserve, standings=standings)
+
+
+def _validate_players(value):
+    for key in ("competition", "season", "players"):
+        if key not in value:
+            raise ValueError(f"missing field {key!r}")
+
+
+LOADERS = {
+    "standings": fetch_standings_normalized,
+    "players": _load_players,
+    "scorers": _load_scorers,
+    "matches": _load_matches,
+}
+
+store = SnapshotStore(
+    os.getenv("SNAPSHOT_DB", os.path.join(os.path.dirname(__file__), "snapshots.db")),
+    validators={
+        "standings": StandingsResponse.model_validate,
+        "players": _validate_players,
+        "matches": lambda value: (value["matches"], value["fullFetchedAt"]),
+    },
+    # Строки составов и таблиц живут в памяти компактными записями (records.py)
+    decoders={
+        "standings": standings_from_json,
+        "players": players_from_json,
+    },
+)
+
+# Квота upstream одна на API-ключ - воркеры делят её через тот же store
+upstream.share_quota(store)
+
+# Сколько ждать снимок, который качает другой воркер, прежде чем отдать старый или ошибку
+SNAPSHOT_WAIT_TIMEOUT = float(os.getenv("SNAPSHOT_WAIT_TIMEOUT", "60"))
+
+cache = SnapshotCache(
+    POLICIES, store=store, holder=HOLDER, encoder=EncodedSnapshot, wait_timeout=SNAPSHOT_WAIT_TIMEOUT,
+)
+
+# Диффы между снимками и их рассылка подписчикам SSE
+changelog = ChangeLog({
+    "standings": ("table", "id"),
+    "players": ("players", "id"),
+})
+hub = BroadcastHub()
+
+
+def _publish_changes(kind, key, entry, previous):
+    event = changelog.record(kind, key, entry.value, entry.fetched_at)
+    if event is not None and (event["changed"] or event["removed"]):
+        hub.publish((kind, key), event["version"], event)
+
+
+cache.listeners.append(_publish_changes)
+
+# Снимки обновляет воркер-лидер прогрева; остальные узнают о них из общего store
+CHANGES_POLL_INTERVAL = float(os.getenv("CHANGES_POLL_INTERVAL", "2"))
+
+
+async def watch_store_changes():
+    """Для тем с подписчиками SSE подтягивает снимки, сохранённые другими воркерами.
+
+    Новый снимок проходит через cache.put, поэтому дифф публикуется и
+    подписчикам этого воркера. Устаревший снимок заодно обновляется -
+    поток не зависит от того, приходят ли в воркер обычные GET.
+    """
+    while True:
+        await asyncio.sleep(CHANGES_POLL_INTERVAL)
+        for kind, key in hub.topics():
+            try:
+                await cache.sync_from_store(kind, key)
+                await get_snapshot_entry(kind, key)
+            except Exception as e:
+                logger.warning("Не удалось обновить снимок для подписчиков: %s", e, extra={"kind": kind, "league": key})
+
+
+def _enrich_on_refresh(kind, key, entry, previous):
+    """Новый снимок составов или бомбардиров - сразу пересобираем статистику лиги в фоне,
+    чтобы первый запрос после обновления не платил за join."""
+    if kind not in ("players", "scorers") or key not in _player_stats:
+        return
+    task = asyncio.ensure_future(_rebuild_stats(key))
+    _stats_tasks.add(task)
+    task.add_done_callback(_stats_tasks.discard)
+
+
+async def _rebuild_stats(competition_id):
+    try:
+        await get_player_stats(competition_id)
+    except Exception as e:
+        logger.warning("Не удалось пересобрать статистику игроков: %s", e, extra={"league": competition_id})
+
+
+cache.listeners.append(_enrich_on_refresh)
+
+
+# --- Метрики, считающиеся в момент запроса /metrics ---
+
+registry.register(Collected(
+    "snapshot_cache_requests_total", "Snapshot cache lookups by result (hit, stale, miss)",
+    "counter", ("kind", "result"), lambda: list(cache.stats.items()),
+))
+registry.register(Collected(
+    "snapshot_age_seconds", "Age of the cached snapshot per league",
+    "gauge", ("kind", "league"),
+    lambda: [((kind, key), round(entry.age, 3)) for kind, key, entry in cache.entries()],
+))
+registry.register(Collected(
+    "upstream_quota_remaining", "Requests left in the current football-data.org quota window",
+    "gauge", (), lambda: [((), upstream.quota.tokens)],
+))
+registry.register(Collected(
+    "upstream_circuit_open", "1 if the circuit breaker for the host is open or half-open",
+    "gauge", ("host",),
+    lambda: [((host,), int(state != "closed")) for host, state in upstream.breakers_state().items()],
+))
+
+warmer = LeagueWarmer(
+    cache,
+    {
+        "standings": fetch_standings_normalized,
+        "players": partial(_load_players, reserve=RESERVED_FOR_STANDINGS),
+        # Матчи и бомбардиры обновляются вместе с таблицами, но квоту им
+        # отдаём только сверх запаса для таблиц - как и сборам составов
+        "scorers": partial(_load_scorers, reserve=RESERVED_FOR_STANDINGS),
+        "matches": partial(_load_matches, reserve=RESERVED_FOR_STANDINGS),
+    },
+    LEAGUES,
+    intervals={
+        # Обновляем раньше истечения TTL, чтобы запросы не попадали на промах
+        "standings": int(os.getenv("WARM_STANDINGS_EVERY", "180")),
+        "players": int(os.getenv("WARM_PLAYERS_EVERY", "14400")),
+        "scorers": int(os.getenv("WARM_SCORERS_EVERY", "1800")),
+        "matches": int(os.getenv("WARM_MATCHES_EVERY", "240")),
+    },
+    squad_spacing=int(os.getenv("WARM_SQUAD_SPACING", "180")),
+    store=store,
+    holder=HOLDER,
+    light_kinds=("standings", "matches", "scorers"),
+)
+WARMER_ENABLED = os.getenv("WARMER_ENABLED", "1") == "1"
+
+
+async def get_snapshot(kind, competition_id):
+    """Снимок данных лиги из кэша; к upstream обращается только при промахе."""
+    return await cache.get(kind, competition_id, LOADERS[kind])
+
+
+async def get_snapshot_entry(kind, competition_id):
+    """Как get_snapshot, но возвращает запись кэша (с закодированным ответом и временем)."""
+    return await cache.get_entry(kind, competition_id, LOADERS[kind])
+
+
+def resolve_league(value):
+    """"la-liga" или "PD" -> "PD"; ValueError для неизвестной лиги."""
+    code = LEAGUE_SLUGS.get(value.lower(), value.upper())
+    if code not in LEAGUES:
+        raise ValueError(f"unknown league {value!r}")
+    return code
+
+
+_player_stats = {}
+_player_stats_lock = asyncio.Lock()
+_stats_tasks = set()
+
+
+async def get_player_stats(competition_id):
+    """Составы лиги со статистикой бомбардиров и лидерборды; строятся один раз на пару снимков.
+
+    Без бомбардиров (upstream недоступен) составы отдаются с нулевой
+    статистикой и пересобираются, как только бомбардиры загрузятся.
+    """
+    players, scorers = await asyncio.gather(
+        get_snapshot_entry("players", competition_id),
+        get_snapshot_entry("scorers", competition_id),
+        return_exceptions=True,
+    )
+    if isinstance(players, Exception):
+        raise players
+    if isinstance(scorers, Exception):
+        logger.warning("Бомбардиры недоступны: %s", scorers, extra={"league": competition_id})
+        scorers = None
+
+    version = (players.fetched_at, scorers.fetched_at if scorers else None)
+    stats = _player_stats.get(competition_id)
+    if stats is None or stats.version != version:
+        async with _player_stats_lock:
+            stats = _player_stats.get(competition_id)
+            if stats is None or stats.version != version:
+                entries = [players] + ([scorers] if scorers else [])
+                stats = await asyncio.to_thread(
+                    PlayerStats,
+                    competition_id,
+                    players.value,
+                    scorers.value if scorers else None,
+                    version,
+                    max(entry.fetched_at for entry in entries),
+                    min(entry.fresh_until for entry in entries),
+                    min(entry.stale_until for entry in entries),
+                )
+                _player_stats[competition_id] = stats
+    return stats
+
+
+_player_index = None
+_player_index_lock = asyncio.Lock()
+
+
+async def get_player_index(leagues=LEAGUES):
+    """Индекс игроков по всем загруженным лигам; перестраивается только при смене снимков.
+
+    Возвращает (index, errors), где errors - {лига: ошибка} для лиг,
+    составы которых получить не удалось.
+    """
+    global _player_index
+    results = await asyncio.gather(
+        *(get_player_stats(league) for league in leagues),
+        return_exceptions=True,
+    )
+    errors = {
+        league: str(result)
+        for league, result in zip(leagues, results)
+        if isinstance(result, Exception)
+    }
+
+    # В индекс попадают все лиги, для которых статистика уже собрана
+    stats = {league: _player_stats[league] for league in LEAGUES if league in _player_stats}
+    version = index_version({league: s.version for league, s in stats.items()})
+
+    if _player_index is None or _player_index.version != version:
+        async with _player_index_lock:
+            if _player_index is None or _player_index.version != version:
+                players = {league: s.players for league, s in stats.items()}
+                _player_index = await asyncio.to_thread(PlayerIndex, players, version)
+    return _player_index, errors
+
+
+_match_indexes = {}
+
+
+async def get_match_index(competition_id):
+    """Индекс матчей лиги; строится один раз на снимок."""
+    entry = await cache.get_entry("matches", competition_id, LOADERS["matches"])
+    index = _match_indexes.get(competition_id)
+    if index is None or index.version != entry.fetched_at:
+        index = MatchIndex(entry.value["matches"], entry.fetched_at)
+        _match_indexes[competition_id] = index
+    return entry.value, index
@@ -0,0 +1,183 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from encoding import dumps
+
+# Повышаем при любом изменении формата нормализованных данных:
+# записи старых версий при чтении отбрасываются.
+SCHEMA_VERSION = 2
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Снимки данных на диске (SQLite), чтобы после рестарта стартовать с данными.
+
+    База открыта в режиме WAL и общая для всех воркеров uvicorn на хосте:
+    читатели не блокируют писателя, таблица leases даёт межпроцессные
+    блокировки с истекающим сроком (кто сейчас ходит в upstream), а таблица
+    quota - общий для воркеров счётчик квоты upstream.
+    """
+
+    def __init__(self, path, validators=None, decoders=None):
+        # validators: {kind: callable}, бросает исключение на несовместимых данных
+        # decoders: {kind: callable}, JSON с диска -> значение снимка в памяти
+        self.path = path
+        self.validators = validators or {}
+        self.decoders = decoders or {}
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Подключаемся лениво - при первом обращении, а не при импорте
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.path, timeout=10, check_same_thread=False, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS snapshots (
+                    kind TEXT NOT NULL,
+                    competition_id TEXT NOT NULL,
+                    schema_version INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    stored_at REAL NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (kind, competition_id)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS quota (
+                    name TEXT PRIMARY KEY,
+                    tokens INTEGER NOT NULL,
+                    reset_at REAL NOT NULL
+                )"""
+            )
+        return self._conn
+
+    def load(self, kind, key):
+        """Возвращает (value, fetched_at) или None, если записи нет или она устарела по схеме."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT schema_version, fetched_at, payload FROM snapshots"
+                " WHERE kind = ? AND competition_id = ?",
+                (kind, key),
+            ).fetchone()
+        if row is None:
+            return None
+
+        schema_version, fetched_at, payload = row
+        try:
+            if schema_version != SCHEMA_VERSION:
+                raise ValueError(f"schema version {schema_version} != {SCHEMA_VERSION}")
+            value = json.loads(payload)
+            validator = self.validators.get(kind)
+            if validator is not None:
+                validator(value)
+            decoder = self.decoders.get(kind)
+            if decoder is not None:
+                value = decoder(value)
+        except Exception as e:
+            logger.warning("Снимок на диске отброшен: %s", e, extra={"kind": kind, "league": key})
+            self.delete(kind, key)
+            return None
+        return value, fetched_at
+
+    def save(self, kind, key, value, fetched_at):
+        payload = dumps(value).decode()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots"
+                " (kind, competition_id, schema_version, fetched_at, stored_at, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, SCHEMA_VERSION, fetched_at, time.time(), payload),
+            )
+
+    def delete(self, kind, key):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM snapshots WHERE kind = ? AND competition_id = ?", (kind, key)
+            )
+
+    def fetched_at(self, kind, key):
+        """Время загрузки сохранённого снимка (дёшево, без чтения payload)."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT fetched_at FROM snapshots"
+                " WHERE kind = ? AND competition_id = ? AND schema_version = ?",
+                (kind, key, SCHEMA_VERSION),
+            ).fetchone()
+        return row[0] if row else None
+
+    # --- Межпроцессные блокировки ---
+
+    def try_acquire_lease(self, name, holder, ttl):
+        """Берёт или продлевает блокировку name; True, если она теперь у holder."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(name) DO UPDATE SET"
+                    " holder = excluded.holder, expires_at = excluded.expires_at"
+                    " WHERE leases.holder = excluded.holder OR leases.expires_at < ?",
+                    (name, holder, now + ttl, now),
+                )
+                row = conn.execute("SELECT holder FROM leases WHERE name = ?", (name,)).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return row is not None and row[0] == holder
+
+    def release_lease(self, name, holder):
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder)
+            )
+
+    # --- Общая квота upstream ---
+
+    def update_quota(self, name, update):
+        """Атомарно для всех процессов меняет счётчик квоты name.
+
+        update(state) получает (tokens, reset_at) или None, если счётчика ещё
+        нет, и возвращает (tokens, reset_at, result); новое состояние
+        записывается, а (tokens, reset_at, result) возвращается.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = conn.execute("SELECT tokens, reset_at FROM quota WHERE name = ?", (name,)).fetchone()
+                tokens, reset_at, result = update(state)
+                conn.execute(
+                    "INSERT OR REPLACE INTO quota (name, tokens, reset_at) VALUES (?, ?, ?)",
+                    (name, tokens, reset_at),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return tokens, reset_at, result
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,75 @@
+import pytest
+
+pytest.importorskip("fastapi")
+
+
+@pytest.fixture(scope="module")
+def backend(tmp_path_factory):
+    # Снимки приложения - во временной базе, а не в backend/snapshots.db
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("SNAPSHOT_DB", str(tmp_path_factory.mktemp("db") / "snapshots.db"))
+        import app as module
+        yield module
+
+
+@pytest.fixture
+def app(backend):
+    return backend.app
+
+
+def test_standings_schema_covers_single_and_batch_responses(app):
+    schema = app.openapi()
+    response = schema["paths"]["/standings"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    refs = {option["$ref"].rsplit("/", 1)[1] for option in response["anyOf"]}
+    assert refs == {"StandingsResponse", "StandingsBatchResponse"}
+    batch = schema["components"]["schemas"]["StandingsBatchResponse"]
+    assert set(batch["required"]) == {"leagues", "errors"}
+
+
+def test_leaderboards_merge_leagues_in_board_order(backend, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from player_stats import PlayerStats
+    from records import PlayerRecord
+
+    def league_stats(league, rows):
+        # rows: (id, имя, команда, id команды, голы, передачи)
+        players = [
+            PlayerRecord(
+                id=row[0], name=row[1], position="Offence", nationality="Unknown", dateOfBirth=None,
+                team=row[2], teamId=row[3], shirtNumber=None, role="PLAYER", age=None,
+            )
+            for row in rows
+        ]
+        scorers = [
+            {"player": {"id": row[0]}, "goals": row[4], "assists": row[5], "penalties": 0, "playedMatches": 10}
+            for row in rows
+        ]
+        return PlayerStats(
+            league, {"competition": league, "season": "2025", "players": players}, {"scorers": scorers},
+            version=1, fetched_at=0.0, fresh_until=0.0, stale_until=0.0,
+        )
+
+    stats = {
+        "PL": league_stats("PL", [(1, "Haaland", "Man City", 65, 15, 2), (2, "Saka", "Arsenal", 57, 7, 4)]),
+        "PD": league_stats("PD", [(10, "Lewandowski", "Barcelona", 81, 15, 1), (11, "Bellingham", "Real Madrid", 86, 7, 6)]),
+    }
+
+    async def get_player_stats(code):
+        if code not in stats:
+            raise RuntimeError("upstream down")
+        return stats[code]
+
+    monkeypatch.setattr(backend, "get_player_stats", get_player_stats)
+    response = TestClient(backend.app).get("/leaderboards", params={"limit": 3})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [row["name"] for row in body["goals"]] == ["Haaland", "Lewandowski", "Bellingham"]
+    assert [row["name"] for row in body["assists"]] == ["Bellingham", "Saka", "Haaland"]
+    assert [row["name"] for row in body["goalsAssists"]] == ["Haaland", "Lewandowski", "Bellingham"]
+    assert [(team["team"], team["league"]) for team in body["teams"]] == [
+        ("Man City", "PL"), ("Barcelona", "PD"), ("Real Madrid", "PD"), ("Arsenal", "PL"),
+    ]
+    # Лиги без данных попадают в errors, но не ломают ответ
+    assert set(body["errors"]) == {"BL1", "SA", "FL1"}
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cache import SnapshotCache
+from store import SnapshotStore
+
+POLICIES = {"standings": (60, 600)}
+
+
+def test_sync_from_store_picks_up_other_worker_snapshot(tmp_path):
+    async def scenario():
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        leader = SnapshotCache(POLICIES, store=store, holder="leader")
+        follower = SnapshotCache(POLICIES, store=store, holder="follower")
+        seen = []
+        follower.listeners.append(lambda kind, key, entry, previous: seen.append(entry.value))
+
+        async def loader(key):
+            return {"table": [key]}
+
+        await leader.get_entry("standings", "PL", loader)
+        assert (await follower.sync_from_store("standings", "PL")).value == {"table": ["PL"]}
+        # Повторно тот же снимок не публикуется
+        assert await follower.sync_from_store("standings", "PL") is None
+        assert seen == [{"table": ["PL"]}]
+        store.close()
+
+    asyncio.run(scenario())
+
+
+def test_store_snapshot_is_read_off_the_event_loop(tmp_path):
+    async def scenario():
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        store.save("standings", "PL", {"table": ["stored"]}, 1.0)
+        threads = []
+        load = store.load
+
+        def tracking_load(kind, key):
+            threads.append(threading.get_ident())
+            return load(kind, key)
+
+        store.load = tracking_load
+        cache = SnapshotCache(POLICIES, store=store, holder="w1")
+        entries = await asyncio.gather(*(cache.peek("standings", "PL") for _ in range(5)))
+        assert {entry.value["table"][0] for entry in entries} == {"stored"}
+        # Одно чтение на все одновременные промахи, и не в потоке event loop
+        assert len(threads) == 1 and threads[0] != threading.get_ident()
+        store.close()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = SnapshotCache(POLICIES)
+        calls = []
+
+        async def loader(key):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return {"table": [key]}
+
+        entries = await asyncio.gather(*(cache.get_entry("standings", "PL", loader) for _ in range(10)))
+        assert calls == ["PL"]
+        assert len({id(entry) for entry in entries}) == 1
+        assert cache.stats[("standings", "miss")] == 10
+
+    asyncio.run(scenario())
+
+
+def test_stale_entry_is_served_while_refreshing():
+    async def scenario():
+        cache = SnapshotCache(POLICIES)
+        cache.put("standings", "PL", {"table": ["old"]}, fetched_at=time.time() - 120)
+        refreshed = asyncio.Event()
+
+        async def loader(key):
+            await refreshed.wait()
+            return {"table": ["new"]}
+
+        assert await cache.get("standings", "PL", loader) == {"table": ["old"]}
+        assert cache.stats[("standings", "stale")] == 1
+        refreshed.set()
+        await cache.refresh("standings", "PL", loader)
+        assert await cache.get("standings", "PL", loader) == {"table": ["new"]}
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_falls_back_to_last_entry():
+    async def scenario():
+        cache = SnapshotCache(POLICIES)
+        # Старше stale_until: запрос ждёт обновления, а не отдаёт снимок сразу
+        cache.put("standings", "PL", {"table": ["old"]}, fetched_at=time.time() - 1000)
+
+        async def loader(key):
+            raise RuntimeError("upstream down")
+
+        assert await cache.get("standings", "PL", loader) == {"table": ["old"]}
+        with pytest.raises(RuntimeError):
+            await cache.get("standings", "PD", loader)
+
+    asyncio.run(scenario())
+
+
+
+def test_workers_sharing_store_load_once(tmp_path):
+    async def scenario():
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        workers = [
+            SnapshotCache(POLICIES, store=store, holder=f"w{i}", poll_interval=0.01) for i in range(3)
+        ]
+        calls = []
+
+        async def loader(key):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return {"table": [key]}
+
+        values = await asyncio.gather(*(worker.get("standings", "PL", loader) for worker in workers))
+        assert calls == ["PL"]
+        assert values == [{"table": ["PL"]}] * 3
+        # Блокировка ключа снята после загрузки
+        assert store.try_acquire_lease("refresh:standings:PL", "other", 60)
+        store.close()
+
+    asyncio.run(scenario())
+
+
+def test_wait_for_dead_lease_holder_is_bounded(tmp_path):
+    async def scenario():
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        # Воркер взял блокировку ключа и упал, не сняв её
+        store.try_acquire_lease("refresh:standings:PL", "dead", 600)
+        cache = SnapshotCache(POLICIES, store=store, holder="w1", poll_interval=0.01, wait_timeout=0.1)
+
+        async def loader(key):
+            raise AssertionError("lease holder fetches, not this worker")
+
+        with pytest.raises(TimeoutError):
+            await cache.get("standings", "PL", loader)
+        cache.put("standings", "PL", {"table": ["old"]}, fetched_at=time.time() - 1000)
+        started = time.monotonic()
+        assert await cache.get("standings", "PL", loader) == {"table": ["old"]}
+        assert time.monotonic() - started < 1
+        store.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+import asyncio
+
+from changes import BroadcastHub, ChangeLog, version_of
+from records import StandingRow
+
+
+def make_row(team_id, points):
+    return StandingRow(
+        id=team_id, position=1, name=f"Team {team_id}", shortName=f"T{team_id}", points=points,
+        goalsFor=0, goalsAgainst=0, goalDifference=0, crest="", played=0, won=0, drawn=0, lost=0,
+    )
+
+
+def make_log(*tables, history=50):
+    log = ChangeLog({"standings": ("table", "id")}, history=history)
+    for t, table in enumerate(tables, start=1):
+        log.record("standings", "PL", {"table": table}, float(t))
+    return log
+
+
+def test_record_returns_diff_of_changed_and_removed_rows():
+    log = make_log([make_row(1, 10), make_row(2, 7)])
+    event = log.record("standings", "PL", {"table": [make_row(1, 13), make_row(3, 0)]}, 2.0)
+    assert event["previous"] == version_of(1.0) and event["version"] == version_of(2.0)
+    assert [row.id for row in event["changed"]] == [1, 3]
+    assert event["removed"] == [2]
+    # Снимок не новее текущего игнорируется
+    assert log.record("standings", "PL", {"table": []}, 2.0) is None
+
+
+def test_since_merges_consecutive_diffs():
+    log = make_log(
+        [make_row(1, 10), make_row(2, 7)],
+        [make_row(1, 13), make_row(2, 7)],
+        [make_row(1, 13), make_row(3, 1)],
+        [make_row(1, 14), make_row(2, 8), make_row(3, 1)],
+    )
+    result = log.since("standings", "PL", version_of(1.0))
+    assert not result["reset"] and result["version"] == version_of(4.0)
+    assert {row.id: row.points for row in result["changed"]} == {1: 14, 2: 8, 3: 1}
+    assert result["removed"] == []
+
+    result = log.since("standings", "PL", version_of(2.0))
+    assert {row.id: row.points for row in result["changed"]} == {1: 14, 2: 8, 3: 1}
+
+
+def test_since_reports_removed_rows_and_current_version():
+    log = make_log([make_row(1, 10), make_row(2, 7)], [make_row(1, 10)])
+    assert log.since("standings", "PL", version_of(1.0))["removed"] == [2]
+    current = log.since("standings", "PL", version_of(2.0))
+    assert current["changed"] == [] and current["removed"] == [] and not current["reset"]
+
+
+def test_since_unknown_version_resets():
+    log = make_log([make_row(1, 10)], [make_row(1, 11)], [make_row(1, 12)], history=1)
+    # version_of(1.0) вытеснена из истории, 1500 - версия, которой не было
+    for since in (None, version_of(1.0), 1500):
+        result = log.since("standings", "PL", since)
+        assert result["reset"]
+        assert [row.points for row in result["changed"]] == [12]
+    assert log.since("standings", "PD", None) is None
+
+
+def test_hub_drops_subscriber_that_falls_behind():
+    async def scenario():
+        hub = BroadcastHub(queue_size=2)
+        fast = hub.subscribe("standings:PL")
+        slow = hub.subscribe("standings:PL")
+        assert hub.topics() == ["standings:PL"]
+
+        hub.publish("standings:PL", 1, {"n": 1})
+        await fast.get()
+        hub.publish("standings:PL", 2, {"n": 2})
+        await fast.get()
+        hub.publish("standings:PL", 3, {"n": 3})
+        message = await fast.get()
+        assert message.startswith(b"id: 3\nevent: diff\n") and b'"n":3' in message
+
+        # Очередь медленного подписчика переполнилась: его поток получает None и закрывается
+        assert hub.subscribers("standings:PL") == 1
+        assert await slow.get() is None
+        hub.unsubscribe("standings:PL", fast)
+        assert hub.topics() == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,36 @@
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from encoding import EncodedSnapshot, encode_batch
+
+
+def test_encoded_snapshot_variants_and_validators():
+    encoded = EncodedSnapshot({"name": "Ødegaard"}, 1700000000.0)
+    assert json.loads(encoded.body) == {"name": "Ødegaard"}
+    assert gzip.decompress(encoded.gzip) == encoded.body
+    assert encoded.pick("gzip, deflate") == (encoded.gzip, "gzip")
+    assert encoded.pick("identity") == (encoded.body, None)
+    assert encoded.not_modified(encoded.etag, None)
+    assert encoded.not_modified(encoded.etag[2:], None)
+    assert not encoded.not_modified('"other"', None)
+    assert encoded.not_modified(None, "Wed, 15 Nov 2023 00:00:00 GMT")
+
+
+def test_encode_batch_stitches_snapshots():
+    parts = [("PL", EncodedSnapshot({"a": 1}, time.time())), ("PD", EncodedSnapshot({"b": 2}, time.time()))]
+    batch = encode_batch(parts, {"SA": "down"})
+    assert json.loads(batch.body) == {"leagues": {"PL": {"a": 1}, "PD": {"b": 2}}, "errors": {"SA": "down"}}
+    assert encode_batch(parts, {"SA": "down"}) is batch
+
+
+def test_encode_batch_is_thread_safe():
+    snapshots = [EncodedSnapshot({"n": n}, time.time()) for n in range(200)]
+
+    def encode(n):
+        return encode_batch([("PL", snapshots[n % 200]), ("PD", snapshots[(n * 7) % 200])], {})
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(encode, range(3000)))
+    assert len(results) == 3000
@@ -0,0 +1,37 @@
+import json
+import logging
+import sys
+
+from logs import JsonFormatter
+
+
+def make_record(**extra):
+    logger = logging.getLogger("test.logs")
+    record = logger.makeRecord("test.logs", logging.WARNING, __file__, 1, "refresh failed: %s", ("boom",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_record_is_one_json_line_with_extra_fields():
+    line = JsonFormatter().format(make_record(league="PL", failures=2))
+    assert "\n" not in line
+    data = json.loads(line)
+    assert data["level"] == "WARNING" and data["logger"] == "test.logs"
+    assert data["msg"] == "refresh failed: boom"
+    assert data["league"] == "PL" and data["failures"] == 2
+    assert data["ts"].endswith("Z")
+    # Служебные поля LogRecord в JSON не повторяются
+    assert "args" not in data and "levelno" not in data
+
+
+def test_exception_and_unserializable_values_are_kept():
+    try:
+        raise ValueError("bad snapshot")
+    except ValueError:
+        record = logging.getLogger("test.logs").makeRecord(
+            "test.logs", logging.ERROR, __file__, 1, "failed", (), sys.exc_info(),
+        )
+    record.kind = {"standings"}
+    data = json.loads(JsonFormatter().format(record))
+    assert "ValueError: bad snapshot" in data["exc"]
+    assert data["kind"] == "{'standings'}"
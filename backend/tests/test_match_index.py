@@ -0,0 +1,54 @@
+from match_index import MatchIndex, merge_matches
+
+
+def make_match(match_id, utc_date, home=1, away=2, status="SCHEDULED"):
+    return {
+        "id": match_id,
+        "utcDate": utc_date,
+        "status": status,
+        "homeTeam": {"id": home},
+        "awayTeam": {"id": away},
+    }
+
+
+MATCHES = [
+    make_match(4, "2025-05-03T14:00:00Z", 3, 1),
+    make_match(1, "2025-05-01T19:00:00Z", 1, 2, "FINISHED"),
+    make_match(3, "2025-05-02T19:00:00Z", 2, 3, "FINISHED"),
+    make_match(2, "2025-05-01T19:00:00Z", 3, 4, "FINISHED"),
+    make_match(5, "2025-05-04T16:30:00Z", 4, 2),
+]
+
+
+def ids(matches):
+    return [match["id"] for match in matches]
+
+
+def test_matches_are_ordered_by_kickoff_then_id():
+    assert ids(MatchIndex(MATCHES, 1).query()) == [1, 2, 3, 4, 5]
+
+
+def test_date_range_includes_whole_days():
+    index = MatchIndex(MATCHES, 1)
+    assert ids(index.query(date_from="2025-05-02", date_to="2025-05-03")) == [3, 4]
+    assert ids(index.query(date_to="2025-05-01")) == [1, 2]
+    assert ids(index.query(date_from="2025-05-05")) == []
+
+
+def test_team_and_status_filters():
+    index = MatchIndex(MATCHES, 1)
+    assert ids(index.query(team_id=2)) == [1, 3, 5]
+    assert ids(index.query(team_id=3, date_from="2025-05-02")) == [3, 4]
+    assert ids(index.query(team_id=3, statuses={"SCHEDULED"})) == [4]
+    assert ids(index.query(team_id=99)) == []
+
+
+def test_merge_matches_replaces_by_id_and_keeps_order():
+    updates = [
+        make_match(3, "2025-05-02T19:00:00Z", 2, 3, "FINISHED"),
+        make_match(5, "2025-04-30T12:00:00Z", 4, 2, "POSTPONED"),
+        make_match(6, "2025-05-05T18:00:00Z", 1, 4),
+    ]
+    merged = merge_matches(MATCHES, updates)
+    assert ids(merged) == [5, 1, 2, 3, 4, 6]
+    assert merged[0]["status"] == "POSTPONED"
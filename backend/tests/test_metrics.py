@@ -0,0 +1,60 @@
+import pytest
+
+from metrics import Counter, Histogram, MetricsMiddleware, Registry, _labels
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1, 10))
+    for value in (0.1, 0.5, 0.7, 100):
+        histogram.observe(value, "/a")
+    lines = list(histogram.render())
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="10"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 101.3',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    assert _labels((), ()) == ""
+    assert _labels(("path",), ('a"b\\c\nd',)) == '{path="a\\"b\\\\c\\nd"}'
+
+
+def test_registry_renders_every_metric():
+    registry = Registry()
+    counter = registry.register(Counter("requests_total", "Requests", ("status",)))
+    counter.inc("200")
+    counter.inc("200", amount=2)
+    assert registry.render() == (
+        "# HELP requests_total Requests\n# TYPE requests_total counter\n"
+        'requests_total{status="200"} 3\n'
+    )
+
+
+def test_middleware_labels_requests_with_the_route_template(monkeypatch):
+    fastapi = pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    import metrics
+
+    histogram = Histogram("http_request_duration_seconds", "Latency", ("route", "method", "status"))
+    monkeypatch.setattr(metrics, "HTTP_LATENCY", histogram)
+    app = fastapi.FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/standings/{league}")
+    def standings(league: str):
+        return {"league": league}
+
+    client = TestClient(app)
+    client.get("/standings/PL")
+    client.get("/standings/PD")
+    client.get("/nowhere")
+    rendered = "\n".join(histogram.render())
+    assert 'http_request_duration_seconds_count{route="/standings/{league}",method="GET",status="200"} 2' in rendered
+    assert 'route="unmatched",method="GET",status="404"' in rendered
+    assert "/standings/PL" not in rendered
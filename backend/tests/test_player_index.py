@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from player_index import CursorError, PlayerIndex, fold, index_version
+from records import PlayerLine, PlayerRecord
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_player(player_id, name, team="Arsenal", nationality="England", age=25, goals=0, league="PL"):
+    record = PlayerRecord(
+        id=player_id, name=name, position="Midfield", nationality=nationality,
+        dateOfBirth=None, team=team, teamId=hash(team) % 1000, shirtNumber=None,
+        role="PLAYER", age=age,
+    )
+    return PlayerLine.from_record(
+        record, league=league, goals=goals, assists=0, goalsAssists=goals, penalties=0, playedMatches=None,
+    )
+
+
+def make_index(players, version=1):
+    return PlayerIndex({"PL": players}, version)
+
+
+def test_fold_strips_diacritics():
+    assert fold("Ødegaard") == "odegaard"
+    assert fold("Müller") == "muller"
+
+
+def test_query_filters_and_name_search():
+    index = make_index([
+        make_player(1, "Martin Ødegaard"),
+        make_player(2, "Bukayo Saka"),
+        make_player(3, "Erling Haaland", team="Man City", nationality="Norway"),
+    ])
+    assert [p.id for p in index.query(q="odeg")["items"]] == [1]
+    assert [p.id for p in index.query({"team": "man city"})["items"]] == [3]
+    assert index.query({"nationality": "England"}, q="saka")["total"] == 1
+
+
+def test_search_matches_team_and_nationality():
+    index = make_index([
+        make_player(1, "Martin Ødegaard", nationality="Norway"),
+        make_player(2, "Bukayo Saka"),
+        make_player(3, "Erling Haaland", team="Man City", nationality="Norway"),
+    ])
+    assert [p.id for p in index.query(q="norw")["items"]] == [3, 1]
+    assert [p.id for p in index.query(q="city")["items"]] == [3]
+    # "ars" нет ни в одном имени - совпадает только команда Arsenal
+    assert {p.id for p in index.query(q="ars")["items"]} == {1, 2}
+
+
+def test_cursor_pages_cover_all_rows_once():
+    players = [make_player(i, f"Player {i:02d}", goals=i % 4) for i in range(23)]
+    index = make_index(players)
+    for sort in ("name", "-goals", "age"):
+        seen, cursor = [], None
+        while True:
+            page = index.query(sort=sort, cursor=cursor, limit=5)
+            seen.extend(p.id for p in page["items"])
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+        assert sorted(seen) == list(range(23))
+        assert len(seen) == 23
+
+
+def test_cursor_from_other_version_is_rejected():
+    players = [make_player(i, f"Player {i}") for i in range(10)]
+    cursor = make_index(players, version=1).query(limit=3)["nextCursor"]
+    with pytest.raises(CursorError):
+        make_index(players, version=2).query(cursor=cursor, limit=3)
+    with pytest.raises(CursorError):
+        make_index(players, version=1).query(sort="-name", cursor=cursor, limit=3)
+
+
+def test_index_version_is_stable_across_processes():
+    snapshots = {"PL": (1700000000.123, 1700000100.5), "PD": (1700000200.0, None)}
+    code = (
+        "from player_index import index_version;"
+        f"print(index_version({snapshots!r}))"
+    )
+    versions = {
+        subprocess.check_output(
+            [sys.executable, "-c", code], cwd=BACKEND, text=True,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        ).strip()
+        for seed in ("1", "2", "3")
+    }
+    assert versions == {str(index_version(snapshots))}
+
+
+def test_unknown_age_is_excluded_from_ranges_and_sorted_last():
+    index = make_index([
+        make_player(1, "Young", age=19),
+        make_player(2, "Unknown", age=None),
+        make_player(3, "Old", age=34),
+    ])
+    assert [p.id for p in index.query(age_max=25)["items"]] == [1]
+    assert [p.id for p in index.query(age_min=30)["items"]] == [3]
+    assert [p.id for p in index.query(sort="age")["items"]] == [1, 3, 2]
+    assert [p.id for p in index.query(sort="-age")["items"]] == [3, 1, 2]
+
+    first = index.query(sort="-age", limit=2)
+    rest = index.query(sort="-age", cursor=first["nextCursor"], limit=2)
+    assert [p.id for p in rest["items"]] == [2]
@@ -0,0 +1,179 @@
+import heapq
+
+from player_stats import BOARDS, PlayerStats, board_key, enrich_players, team_key
+from records import PlayerRecord
+
+ARSENAL, CITY = 57, 65
+
+
+def make_record(player_id, name, team="Arsenal", team_id=ARSENAL):
+    return PlayerRecord(
+        id=player_id, name=name, position="Offence", nationality="England",
+        dateOfBirth=None, team=team, teamId=team_id, shirtNumber=None,
+        role="PLAYER", age=25,
+    )
+
+
+def make_scorer(player_id, goals, assists=0, penalties=0, played=10):
+    return {
+        "player": {"id": player_id},
+        "goals": goals,
+        "assists": assists,
+        "penalties": penalties,
+        "playedMatches": played,
+    }
+
+
+def make_stats(league, players, scorers):
+    return PlayerStats(
+        league,
+        {"competition": league, "season": "2025", "players": players},
+        {"scorers": scorers} if scorers is not None else None,
+        version=1, fetched_at=0.0, fresh_until=0.0, stale_until=0.0,
+    )
+
+
+def test_enrich_joins_scorers_by_player_id():
+    players = [make_record(1, "Saka"), make_record(2, "Ødegaard"), make_record(3, "Rice")]
+    scorers = [
+        make_scorer(2, 5, assists=None, penalties=None, played=12),
+        make_scorer(1, 7, assists=4, penalties=1),
+        # Бомбардира нет в составах - строка не должна попасть в результат
+        make_scorer(99, 20, assists=3),
+    ]
+    enriched = {row.id: row for row in enrich_players(players, scorers, "PL")}
+
+    assert set(enriched) == {1, 2, 3}
+    saka, odegaard, rice = enriched[1], enriched[2], enriched[3]
+    assert (saka.goals, saka.assists, saka.goalsAssists, saka.penalties) == (7, 4, 11, 1)
+    # null в assists/penalties - это ноль, а не ошибка
+    assert (odegaard.goals, odegaard.assists, odegaard.goalsAssists, odegaard.penalties) == (5, 0, 5, 0)
+    assert odegaard.playedMatches == 12
+    # Игрок не из списка бомбардиров - нули и неизвестное число матчей
+    assert (rice.goals, rice.assists, rice.goalsAssists, rice.playedMatches) == (0, 0, 0, None)
+    assert all(row.league == "PL" for row in enriched.values())
+    assert saka.name == "Saka" and saka.teamId == ARSENAL
+
+
+def test_boards_rank_and_skip_zero_rows():
+    stats = make_stats("PL", [
+        make_record(1, "Saka"),
+        make_record(2, "Havertz"),
+        make_record(3, "Rice"),
+        make_record(4, "Haaland", "Man City", CITY),
+        make_record(5, "Foden", "Man City", CITY),
+    ], [
+        make_scorer(4, 15),
+        make_scorer(1, 7, assists=4),
+        make_scorer(2, 7, assists=2),
+        make_scorer(5, 3, assists=8),
+        make_scorer(3, 0, assists=3),
+    ])
+
+    # При равенстве поля выше тот, у кого больше голов, затем по имени
+    assert [row.name for row in stats.boards["goals"]] == ["Haaland", "Havertz", "Saka", "Foden"]
+    assert [row.name for row in stats.boards["assists"]] == ["Foden", "Saka", "Rice", "Havertz"]
+    assert [row.name for row in stats.boards["goalsAssists"]] == ["Haaland", "Saka", "Foden", "Havertz", "Rice"]
+    # Нулевые строки в лидерборд поля не попадают
+    assert "Rice" not in [row.name for row in stats.boards["goals"]]
+
+
+def test_boards_tie_breaks_by_goals_then_folded_name():
+    stats = make_stats("PL", [
+        make_record(1, "Zinchenko"),
+        make_record(2, "Ødegaard"),
+        make_record(3, "Martinelli"),
+    ], [
+        make_scorer(1, 1, assists=5),
+        make_scorer(2, 4, assists=2),
+        make_scorer(3, 2, assists=4),
+    ])
+    assert [row.name for row in stats.boards["goalsAssists"]] == ["Ødegaard", "Martinelli", "Zinchenko"]
+    stats = make_stats("PL", [make_record(1, "Zinchenko"), make_record(2, "Ødegaard")], [
+        make_scorer(1, 3), make_scorer(2, 3),
+    ])
+    # "Ødegaard" сравнивается как "odegaard", а не после "Z"
+    assert [row.name for row in stats.boards["goals"]] == ["Ødegaard", "Zinchenko"]
+
+
+def test_by_team_and_team_totals():
+    stats = make_stats("PL", [
+        make_record(1, "Saka"),
+        make_record(2, "Havertz"),
+        make_record(3, "White"),
+        make_record(4, "Haaland", "Man City", CITY),
+        make_record(5, "Foden", "Man City", CITY),
+    ], [
+        make_scorer(1, 7, assists=4),
+        make_scorer(2, 9, assists=1),
+        make_scorer(4, 15, assists=2),
+        make_scorer(5, 3, assists=8),
+    ])
+
+    assert [row.name for row in stats.by_team[ARSENAL]["goals"]] == ["Havertz", "Saka"]
+    assert [row.name for row in stats.by_team[CITY]["assists"]] == ["Foden", "Haaland"]
+    # У игрока без голов и передач нет строки в by_team
+    assert all(row.name != "White" for rows in stats.by_team[ARSENAL].values() for row in rows)
+
+    arsenal, city = sorted(stats.teams, key=lambda team: team["teamId"])
+    assert arsenal == {
+        "teamId": ARSENAL, "team": "Arsenal", "league": "PL",
+        "goals": 16, "assists": 5, "goalsAssists": 21, "topScorer": "Havertz",
+    }
+    assert (city["goals"], city["assists"], city["goalsAssists"], city["topScorer"]) == (18, 10, 28, "Haaland")
+    assert [team["teamId"] for team in stats.teams] == [CITY, ARSENAL]
+
+
+def test_team_without_scorers_has_no_top_scorer():
+    stats = make_stats("PL", [make_record(1, "Saka"), make_record(2, "Haaland", "Man City", CITY)], None)
+    assert stats.boards == {field: [] for field in BOARDS}
+    assert stats.by_team == {}
+    assert {team["teamId"]: team["topScorer"] for team in stats.teams} == {ARSENAL: None, CITY: None}
+    assert all(team["goalsAssists"] == 0 for team in stats.teams)
+
+
+def test_leaders_limit_and_team_filter():
+    stats = make_stats("PL", [
+        make_record(1, "Saka"),
+        make_record(2, "Havertz"),
+        make_record(3, "Haaland", "Man City", CITY),
+    ], [make_scorer(1, 7, assists=4), make_scorer(2, 9), make_scorer(3, 15)])
+
+    leaders = stats.leaders(limit=2)
+    assert [row.name for row in leaders["goals"]] == ["Haaland", "Havertz"]
+    assert len(leaders["teams"]) == 2
+
+    arsenal = stats.leaders(limit=10, team_id=ARSENAL)
+    assert [row.name for row in arsenal["goals"]] == ["Havertz", "Saka"]
+    assert [row.name for row in arsenal["assists"]] == ["Saka"]
+    assert [team["teamId"] for team in arsenal["teams"]] == [ARSENAL]
+
+    unknown = stats.leaders(team_id=1)
+    assert unknown == {"goals": [], "assists": [], "goalsAssists": [], "teams": []}
+
+
+def test_merged_boards_across_leagues_match_a_full_sort():
+    premier = make_stats("PL", [
+        make_record(1, "Haaland", "Man City", CITY),
+        make_record(2, "Saka"),
+        make_record(3, "Ødegaard"),
+    ], [make_scorer(1, 15, assists=2), make_scorer(2, 7, assists=4), make_scorer(3, 7, assists=6)])
+    liga = make_stats("PD", [
+        make_record(10, "Lewandowski", "Barcelona", 81),
+        make_record(11, "Mbappé", "Real Madrid", 86),
+        make_record(12, "Bellingham", "Real Madrid", 86),
+    ], [make_scorer(10, 15, assists=1), make_scorer(11, 12, assists=4), make_scorer(12, 7, assists=6)])
+    parts = [premier.leaders(limit=10), liga.leaders(limit=10)]
+
+    for field in BOARDS:
+        merged = list(heapq.merge(*(part[field] for part in parts), key=board_key(field)))
+        everyone = premier.players + liga.players
+        expected = sorted((row for row in everyone if getattr(row, field) > 0), key=board_key(field))
+        assert merged == expected
+    # Равные 15 голов в разных лигах: порядок решает имя
+    goals = list(heapq.merge(*(part["goals"] for part in parts), key=board_key("goals")))
+    assert [row.name for row in goals[:3]] == ["Haaland", "Lewandowski", "Mbappé"]
+
+    teams = list(heapq.merge(*(part["teams"] for part in parts), key=team_key))
+    assert teams == sorted(premier.teams + liga.teams, key=team_key)
+    assert [team["league"] for team in teams[:2]] == ["PD", "PL"]
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from ratelimit import QuotaLimiter
+from store import SnapshotStore
+
+
+def test_acquire_spends_tokens_until_reserve():
+    async def scenario():
+        limiter = QuotaLimiter(capacity=3, window=60)
+        await limiter.acquire()
+        await limiter.acquire(reserve=1)
+        assert limiter.tokens == 1
+        # Последний токен оставлен для запросов без reserve
+        waiter = asyncio.ensure_future(limiter.acquire(reserve=1))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        waiter.cancel()
+        await limiter.acquire()
+        assert limiter.tokens == 0
+
+    asyncio.run(scenario())
+
+
+def test_background_waiters_do_not_hold_slots():
+    async def scenario():
+        limiter = QuotaLimiter(capacity=10, window=5, max_concurrency=5)
+        limiter.tokens = 2
+
+        async def background():
+            async with limiter.slot(reserve=2):
+                pass
+
+        waiting = [asyncio.ensure_future(background()) for _ in range(20)]
+        await asyncio.sleep(0.05)
+
+        started = time.monotonic()
+        async with limiter.slot():
+            elapsed = time.monotonic() - started
+        assert elapsed < 0.5
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_update_from_headers_only_lowers_tokens():
+    async def scenario():
+        limiter = QuotaLimiter(capacity=10)
+        limiter.tokens = 4
+        await limiter.update_from_headers({"X-Requests-Available-Minute": "7", "X-RequestCounter-Reset": "12"})
+        assert limiter.tokens == 4
+        await limiter.update_from_headers({"X-Requests-Available-Minute": "1"})
+        assert limiter.tokens == 1
+        assert 11 < limiter.reset_at - time.monotonic() <= 12
+
+    asyncio.run(scenario())
+
+
+def test_exhaust_blocks_until_retry_after():
+    async def scenario():
+        limiter = QuotaLimiter(capacity=10, window=60)
+        await limiter.exhaust("30")
+        assert limiter.tokens == 0
+        assert limiter.reset_at - time.monotonic() > 29
+
+    asyncio.run(scenario())
+
+
+def test_workers_share_one_quota_through_the_store(tmp_path):
+    async def scenario():
+        store = SnapshotStore(str(tmp_path / "snapshots.db"))
+        # Два воркера с одним API-ключом: вместе - не больше capacity за окно
+        workers = [QuotaLimiter(capacity=4, window=60, store=store) for _ in range(2)]
+        for i in range(4):
+            await workers[i % 2].acquire()
+        waiter = asyncio.ensure_future(workers[0].acquire())
+        await asyncio.sleep(0.2)
+        assert not waiter.done()
+        waiter.cancel()
+
+        # 429 у одного воркера останавливает и другой
+        await workers[1].exhaust("30")
+        await workers[0].update_from_headers({"X-Requests-Available-Minute": "9"})
+        assert workers[0].tokens == 0
+        assert workers[0].reset_at - time.time() > 29
+        store.close()
+
+    asyncio.run(scenario())
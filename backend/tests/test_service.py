@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+import service  # noqa: E402
+
+
+def standings_payload(team_ids):
+    return {
+        "competition": {"name": "Premier League"},
+        "season": {"startDate": "2025-08-15"},
+        "standings": [{"table": [
+            {
+                "team": {"id": team_id, "name": f"Team {team_id}", "shortName": "T", "crest": "c"},
+                "position": position, "points": 0, "goalsFor": 0, "goalsAgainst": 0,
+                "goalDifference": 0, "playedGames": 0, "won": 0, "draw": 0, "lost": 0,
+            }
+            for position, team_id in enumerate(team_ids, start=1)
+        ]}],
+    }
+
+
+def team_payload(team_id):
+    return {
+        "id": team_id, "name": f"Team {team_id}", "shortName": "T", "crest": "c",
+        "squad": [{"id": team_id * 100, "name": "Player", "dateOfBirth": "2000-01-01"}],
+    }
+
+
+def test_harvest_fails_when_a_team_fails(monkeypatch):
+    calls = []
+
+    async def fake_fetch_json(path, params=None, reserve=0, timeout=None):
+        calls.append(path)
+        if path.endswith("/standings"):
+            return standings_payload([1, 2, 3])
+        if path == "/teams/2":
+            raise httpx.ConnectError("boom")
+        return team_payload(int(path.rsplit("/", 1)[1]))
+
+    monkeypatch.setattr(service, "fetch_json", fake_fetch_json)
+    with pytest.raises(service.IncompleteSquadsError):
+        asyncio.run(service.get_players_by_competition("PL"))
+
+
+def test_harvest_returns_every_team(monkeypatch):
+    async def fake_fetch_json(path, params=None, reserve=0, timeout=None):
+        if path.endswith("/standings"):
+            return standings_payload([1, 2])
+        return team_payload(int(path.rsplit("/", 1)[1]))
+
+    monkeypatch.setattr(service, "fetch_json", fake_fetch_json)
+    result = asyncio.run(service.get_players_by_competition("PL"))
+    assert [p.teamId for p in result["players"]] == [1, 2]
+
+
+def test_harvest_reuses_cached_standings(monkeypatch):
+    calls = []
+
+    async def fake_fetch_json(path, params=None, reserve=0, timeout=None):
+        calls.append(path)
+        if path.endswith("/standings"):
+            return standings_payload([1, 2])
+        return team_payload(int(path.rsplit("/", 1)[1]))
+
+    monkeypatch.setattr(service, "fetch_json", fake_fetch_json)
+    standings = asyncio.run(service.fetch_standings_normalized("PL"))
+    calls.clear()
+    result = asyncio.run(service.get_players_by_competition("PL", standings=standings))
+    assert sorted(calls) == ["/teams/1", "/teams/2"]
+    assert (result["competition"], result["season"]) == ("Premier League", "2025")
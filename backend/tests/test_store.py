@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from store import SCHEMA_VERSION, SnapshotStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+    yield store
+    store.close()
+
+
+def test_save_and_load_roundtrip(store):
+    store.save("standings", "PL", {"table": [{"id": 1}]}, 100.5)
+    assert store.load("standings", "PL") == ({"table": [{"id": 1}]}, 100.5)
+    assert store.fetched_at("standings", "PL") == 100.5
+    assert store.load("standings", "PD") is None
+
+
+def test_other_schema_version_is_dropped(store):
+    store.save("standings", "PL", {"table": []}, 1.0)
+    store._connect().execute("UPDATE snapshots SET schema_version = ?", (SCHEMA_VERSION - 1,))
+    assert store.fetched_at("standings", "PL") is None
+    assert store.load("standings", "PL") is None
+    assert store._connect().execute("SELECT COUNT(*) FROM snapshots").fetchone()[0] == 0
+
+
+def test_invalid_snapshot_is_dropped(tmp_path):
+    def require_table(value):
+        if "table" not in value:
+            raise ValueError("no table")
+
+    store = SnapshotStore(str(tmp_path / "snapshots.db"), validators={"standings": require_table})
+    store.save("standings", "PL", {"rows": []}, 1.0)
+    assert store.load("standings", "PL") is None
+    assert store.fetched_at("standings", "PL") is None
+    store.close()
+
+
+
+def test_lease_is_exclusive_until_released(store):
+    assert store.try_acquire_lease("warmer", "w1", 60)
+    assert not store.try_acquire_lease("warmer", "w2", 60)
+    # Держатель продлевает свою блокировку
+    assert store.try_acquire_lease("warmer", "w1", 60)
+    store.release_lease("warmer", "w2")
+    assert not store.try_acquire_lease("warmer", "w2", 60)
+    store.release_lease("warmer", "w1")
+    assert store.try_acquire_lease("warmer", "w2", 60)
+
+
+def test_expired_lease_can_be_taken_over(store):
+    assert store.try_acquire_lease("warmer", "w1", 0.05)
+    time.sleep(0.1)
+    assert store.try_acquire_lease("warmer", "w2", 60)
+    assert not store.try_acquire_lease("warmer", "w1", 60)
@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+
+import upstream  # noqa: E402
+from upstream import CircuitBreaker, CircuitOpenError  # noqa: E402
+
+
+def test_breaker_opens_after_threshold_and_allows_one_probe():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.opened_at = time.monotonic() - 31
+    assert breaker.state == "half-open"
+    assert breaker.before_request() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_cancelled_probe_releases_the_breaker(monkeypatch):
+    async def scenario():
+        breaker = upstream.breaker_for(upstream.API_BASE_URL + "/x")
+        breaker.failures = breaker.failure_threshold
+        breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(3600)
+
+        monkeypatch.setattr(upstream, "_send", hang)
+        probe = asyncio.ensure_future(upstream.fetch_json("/x"))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        # Следующий запрос снова может стать пробным
+        assert breaker.before_request() is True
+        breaker.record_success()
+        await upstream.close()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """Подменяет отправку запроса: ответы берутся по очереди из списка, паузы не ждутся."""
+    responses, backoffs = [], []
+
+    async def send(client, url, params, reserve, extra, endpoint):
+        return responses.pop(0)
+
+    def backoff(attempt, retry_after=None):
+        backoffs.append((attempt, retry_after))
+        return 0
+
+    monkeypatch.setattr(upstream, "_send", send)
+    monkeypatch.setattr(upstream, "_backoff", backoff)
+    monkeypatch.setattr(upstream, "_breakers", {})
+    monkeypatch.setattr(upstream, "quota", upstream.QuotaLimiter(capacity=10))
+    return responses, backoffs
+
+
+def response(status, headers=None, body=None):
+    request = httpx.Request("GET", upstream.API_BASE_URL + "/x")
+    return httpx.Response(status, headers=headers, json=body if body is not None else {}, request=request)
+
+
+def fetch(path="/x"):
+    async def scenario():
+        try:
+            return await upstream.fetch_json(path)
+        finally:
+            await upstream.close()
+
+    return asyncio.run(scenario())
+
+
+def test_5xx_is_retried_with_backoff(fake_upstream):
+    responses, backoffs = fake_upstream
+    responses.extend([response(503, {"Retry-After": "2"}), response(500), response(200, body={"ok": True})])
+    assert fetch() == {"ok": True}
+    assert backoffs == [(0, 2.0), (1, None)]
+    # Успешный повтор сбрасывает счётчик сбоев
+    (breaker,) = upstream._breakers.values()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_5xx_on_every_attempt_raises(fake_upstream):
+    responses, backoffs = fake_upstream
+    responses.extend(response(502) for _ in range(upstream.MAX_ATTEMPTS))
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch()
+    assert not responses
+    assert len(backoffs) == upstream.MAX_ATTEMPTS - 1
+
+
+def test_429_waits_for_the_quota_window_and_retries(fake_upstream):
+    responses, backoffs = fake_upstream
+    responses.extend([response(429, {"Retry-After": "15"}), response(200, body={"ok": True})])
+    assert fetch() == {"ok": True}
+    # Пауза - в лимитере квоты, а не в backoff
+    assert backoffs == []
+    assert upstream.quota.tokens == 0
+    assert upstream.quota.reset_at - time.monotonic() > 14
+
+
+def test_429_on_last_attempt_raises_and_keeps_breaker_closed(fake_upstream):
+    responses, _ = fake_upstream
+    responses.extend(response(429) for _ in range(upstream.MAX_ATTEMPTS))
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        fetch()
+    assert error.value.response.status_code == 429
+    assert set(upstream.breakers_state().values()) == {"closed"}
+
+
+def test_retry_after_parses_seconds_and_dates(monkeypatch):
+    assert upstream._retry_after({"Retry-After": "7"}) == 7.0
+    assert upstream._retry_after({}) is None
+    assert upstream._retry_after({"Retry-After": "soon"}) is None
+    monkeypatch.setattr(upstream.time, "time", lambda: 1_700_000_000.0)
+    assert upstream._retry_after({"Retry-After": "Tue, 14 Nov 2023 22:13:30 GMT"}) == 10.0
+    assert upstream._retry_after({"Retry-After": "Tue, 14 Nov 2023 22:13:00 GMT"}) == 0
+
+
+def test_backoff_is_capped_and_jittered():
+    assert upstream._backoff(0, retry_after=1000) == upstream.BACKOFF_CAP
+    assert upstream._backoff(3, retry_after=1.5) == 1.5
+    for attempt in range(10):
+        delay = upstream._backoff(attempt)
+        assert 0 <= delay <= min(upstream.BACKOFF_CAP, upstream.BACKOFF_BASE * 2 ** attempt)
+
+
+def test_client_starts_without_api_key(monkeypatch):
+    assert upstream.auth_headers(None) == {}
+    assert upstream.auth_headers("key") == {"X-Auth-Token": "key"}
+    monkeypatch.setattr(upstream, "HEADERS", upstream.auth_headers(None))
+
+    async def scenario():
+        client = await upstream.start()
+        assert "X-Auth-Token" not in client.headers
+        await upstream.close()
+
+    asyncio.run(scenario())
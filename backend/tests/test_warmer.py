@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+from cache import SnapshotCache
+from warmer import LeagueWarmer
+
+
+class FailingCache:
+    """Кэш, у которого любое обновление падает."""
+
+    def __init__(self, entries=()):
+        self.entries = dict(entries)
+        self.refreshes = []
+
+    async def peek(self, kind, key):
+        return self.entries.get((kind, key))
+
+    async def _fail(self):
+        raise RuntimeError("upstream down")
+
+    def refresh(self, kind, key, loader):
+        self.refreshes.append((kind, key))
+        return asyncio.ensure_future(self._fail())
+
+
+class Entry:
+    def __init__(self, fetched_at):
+        self.fetched_at = fetched_at
+
+
+def test_failed_refresh_is_retried_with_backoff():
+    async def scenario():
+        warmer = LeagueWarmer(
+            FailingCache(), {"standings": None}, ["PL"], intervals={"standings": 300}, retry_base=10,
+        )
+        job = warmer.jobs[0]
+        await warmer._refresh(job)
+        assert job.failures == 1 and job.last_error == "upstream down"
+        assert 9 < job.next_refresh - time.time() <= 10
+        await warmer._refresh(job)
+        assert job.failures == 2 and 19 < job.next_refresh - time.time() <= 20
+        assert not job.running
+
+    asyncio.run(scenario())
+
+
+def test_schedule_staggers_squads_and_resumes_from_snapshots():
+    async def scenario():
+        now = time.time()
+        cache = FailingCache({("standings", "PD"): Entry(now - 10)})
+        warmer = LeagueWarmer(
+            cache, {"standings": None, "players": None}, ["PL", "PD", "BL1"],
+            intervals={"standings": 60, "players": 600}, squad_spacing=100,
+        )
+        await warmer._resume_from_cache()
+        next_refresh = {(job.kind, job.league): job.next_refresh - now for job in warmer.jobs}
+        # Таблицы - сразу, составы - со сдвигом по лиге
+        assert abs(next_refresh[("standings", "PL")]) < 1
+        assert [round(next_refresh[("players", league)], -1) for league in ("PL", "PD", "BL1")] == [0, 100, 200]
+        # Снимок десятисекундной давности обновится не раньше, чем через интервал
+        assert 49 < next_refresh[("standings", "PD")] <= 50
+
+    asyncio.run(scenario())
+
+
+class HangingCache:
+    """Кэш, у которого обновление никогда не завершается (ждёт квоту)."""
+
+    def __init__(self):
+        self.refreshes = []
+
+    async def peek(self, kind, key):
+        return None
+
+    def refresh(self, kind, key, loader):
+        self.refreshes.append((kind, key))
+        return asyncio.get_running_loop().create_future()
+
+
+class LeaseStore:
+    def __init__(self):
+        self.renewals = 0
+
+    def try_acquire_lease(self, name, holder, ttl):
+        self.renewals += 1
+        return True
+
+    def release_lease(self, name, holder):
+        pass
+
+
+def test_lease_is_renewed_while_refreshes_wait():
+    async def scenario():
+        cache, store = HangingCache(), LeaseStore()
+        warmer = LeagueWarmer(
+            cache, {"standings": None, "players": None}, ["PL", "PD"],
+            intervals={"standings": 60, "players": 600}, squad_spacing=0,
+            store=store, holder="w1",
+        )
+        warmer.start()
+        await asyncio.sleep(2.3)
+        status = warmer.status()
+        await warmer.stop()
+
+        assert store.renewals >= 3
+        # Все таблицы запущены, но составы - по одной лиге за раз
+        assert sorted(cache.refreshes) == [("players", "PL"), ("standings", "PD"), ("standings", "PL")]
+        assert sum(job["running"] for job in status["leagues"]) == 3
+
+    asyncio.run(scenario())
+
+
+
+def test_cancelled_warmer_does_not_cancel_waiting_requests():
+    async def scenario():
+        cache = SnapshotCache({"standings": (60, 600)})
+        release = asyncio.Event()
+
+        async def loader(key):
+            await release.wait()
+            return {"table": [key]}
+
+        warmer = LeagueWarmer(cache, {"standings": loader}, ["PL"], intervals={"standings": 60})
+        refresh = asyncio.create_task(warmer._refresh(warmer.jobs[0]))
+        await asyncio.sleep(0)
+        request = asyncio.create_task(cache.get("standings", "PL", loader))
+        await asyncio.sleep(0)
+        # Воркер теряет лидерство: задача прогрева отменяется, а общая загрузка - нет
+        refresh.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await request == {"table": ["PL"]}
+        assert refresh.cancelled() and not warmer.jobs[0].running
+
+    asyncio.run(scenario())
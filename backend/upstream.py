@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+from dotenv import load_dotenv
+
+from metrics import UPSTREAM_LATENCY, UPSTREAM_REQUESTS
+from ratelimit import QuotaLimiter
+
+try:
+    import h2  # noqa: F401  HTTP/2 в httpx включается только при установленном h2
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+API_BASE_URL = os.getenv("FOOTBALL_DATA_URL", "https://api.football-data.org/v4")
+
+
+def auth_headers(api_key):
+    """Заголовок с ключом API; без ключа не отправляется - httpx не принимает None в заголовках."""
+    return {"X-Auth-Token": api_key} if api_key else {}
+
+
+HEADERS = auth_headers(os.getenv("API_KEY"))
+
+MAX_ATTEMPTS = int(os.getenv("API_MAX_ATTEMPTS", "4"))
+BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.getenv("API_BACKOFF_CAP", "20"))
+
+# Одна квота на API-ключ, поэтому лимитер общий для всего процесса
+# (а после share_quota - и для всех воркеров на хосте).
+quota = QuotaLimiter(
+    capacity=int(os.getenv("API_REQUESTS_PER_MINUTE", "10")),
+    max_concurrency=int(os.getenv("API_MAX_CONCURRENCY", "5")),
+)
+
+
+def share_quota(store):
+    """Переводит счётчик квоты в общий store, чтобы воркеры не тратили каждый свою квоту."""
+    quota.store = store
+
+
+class CircuitOpenError(Exception):
+    """Upstream недавно падал подряд - запрос не отправляется."""
+
+
+class CircuitBreaker:
+    """Размыкается после failure_threshold сбоев подряд и reset_timeout секунд
+    отклоняет запросы сразу; затем пропускает один пробный (half-open)."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probe = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_request(self):
+        """Пропускает запрос или бросает CircuitOpenError; True - это пробный запрос."""
+        state = self.state
+        if state == "open" or (state == "half-open" and self._probe):
+            raise CircuitOpenError("upstream circuit is open")
+        if state == "half-open":
+            self._probe = True
+            return True
+        return False
+
+    def release_probe(self):
+        """Пробный запрос завершился без результата (отмена, сбой разбора) - можно пробовать снова."""
+        self._probe = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probe = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_client = None
+
+
+def breaker_for(url):
+    host = urlsplit(url).netloc
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(
+            failure_threshold=int(os.getenv("BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("BREAKER_RESET", "30")),
+        )
+    return breaker
+
+
+def breakers_state():
+    return {host: breaker.state for host, breaker in _breakers.items()}
+
+
+async def start():
+    """Создаёт общий клиент с keep-alive (вызывается из lifespan приложения)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            http2=HTTP2,
+            timeout=httpx.Timeout(20, connect=10),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120),
+        )
+    return _client
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def endpoint_label(path):
+    """/teams/57 -> /teams/{id}: метки метрик без бесконечного числа значений."""
+    path = re.sub(r"^/competitions/[^/]+", "/competitions/{id}", path)
+    return re.sub(r"/\d+", "/{id}", path)
+
+
+def _retry_after(headers):
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt, retry_after=None):
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_CAP)
+    # Экспоненциальная пауза с полным джиттером, чтобы повторы не шли волной
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+async def fetch_json(path, params=None, reserve=0, timeout=None):
+    """GET к football-data.org через общий клиент: квота, повторы и circuit breaker.
+
+    429 ждёт сброса окна квоты; сетевые ошибки и 5xx повторяются с паузой;
+    остальные 4xx сразу поднимаются как httpx.HTTPStatusError.
+    """
+    client = await start()
+    url = f"{API_BASE_URL}{path}"
+    breaker = breaker_for(url)
+    extra = {"timeout": timeout} if timeout is not None else {}
+    endpoint = endpoint_label(path)
+
+    for attempt in range(MAX_ATTEMPTS):
+        last = attempt == MAX_ATTEMPTS - 1
+        probe = breaker.before_request()
+        try:
+            response = await _send(client, url, params, reserve, extra, endpoint)
+        except httpx.TransportError as e:
+            UPSTREAM_REQUESTS.inc(endpoint, "error")
+            logger.warning("Сетевая ошибка upstream: %s", e, extra={"endpoint": endpoint, "attempt": attempt})
+            breaker.record_failure()
+            if last:
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        finally:
+            # Отменённая проба (или любая другая ошибка) не должна оставить breaker
+            # в half-open с занятой пробой - тогда он отклонял бы все запросы
+            if probe:
+                breaker.release_probe()
+
+        UPSTREAM_REQUESTS.inc(endpoint, str(response.status_code))
+        await quota.update_from_headers(response.headers)
+        if response.status_code == 429:
+            logger.warning("Квота upstream исчерпана (429)", extra={"endpoint": endpoint, "attempt": attempt})
+            # Upstream ответил, это квота, а не сбой хоста: ждём окно в лимитере
+            breaker.record_success()
+            await quota.exhaust(_retry_after(response.headers) or response.headers.get("X-RequestCounter-Reset"))
+            if not last:
+                continue
+        elif response.status_code >= 500:
+            breaker.record_failure()
+            if not last:
+                await asyncio.sleep(_backoff(attempt, _retry_after(response.headers)))
+                continue
+        else:
+            breaker.record_success()
+
+        response.raise_for_status()
+        return response.json()
+
+
+async def _send(client, url, params, reserve, extra, endpoint):
+    async with quota.slot(reserve):
+        started = time.perf_counter()
+        try:
+            return await client.get(url, params=params, **extra)
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint)
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(ts):
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+class JobState:
+    __slots__ = ("kind", "league", "last_refreshed", "next_refresh", "last_error", "failures", "running")
+
+    def __init__(self, kind, league, next_refresh):
+        self.kind = kind
+        self.league = league
+        self.last_refreshed = None
+        self.next_refresh = next_refresh
+        self.last_error = None
+        self.failures = 0
+        self.running = False
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "league": self.league,
+            "lastRefreshed": _iso(self.last_refreshed),
+            "nextRefresh": _iso(self.next_refresh),
+            "lastError": self.last_error,
+            "failures": self.failures,
+            "running": self.running,
+        }
+
+
+class LeagueWarmer:
+    """Фоновое обновление снимков всех лиг вне пути запроса.
+
+    Лёгкие виды данных (по одному запросу на лигу: таблицы, матчи) обновляются
+    в первую очередь; сборы составов (по ~21 запросу на лигу) идут по одной
+    лиге за раз и разнесены во времени, чтобы не выбирать всю минутную квоту разом.
+
+    При нескольких воркерах прогрев ведёт только лидер - держатель блокировки
+    "warmer" в общем store; остальные воркеры читают его снимки.
+    """
+
+    def __init__(self, cache, loaders, leagues, intervals, squad_spacing=180, retry_base=60,
+                 store=None, holder=None, lease_ttl=90, light_kinds=("standings",)):
+        # loaders/intervals: {kind: ...}; виды из light_kinds имеют приоритет
+        self.cache = cache
+        self.light_kinds = set(light_kinds)
+        self.loaders = loaders
+        self.intervals = intervals
+        self.retry_base = retry_base
+        self.store = store
+        self.holder = holder
+        self.lease_ttl = lease_ttl
+        self.is_leader = store is None
+        now = time.time()
+        self.jobs = []
+        for i, league in enumerate(leagues):
+            for kind in loaders:
+                # Тяжёлые сборы составов стартуют со сдвигом, по одной лиге
+                delay = 0 if kind in self.light_kinds else i * squad_spacing
+                self.jobs.append(JobState(kind, league, now + delay))
+        self._task = None
+        self._heavy = None
+        self._light = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = [task for task in (self._task, self._heavy, *self._light) if task is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = self._heavy = None
+        self._light.clear()
+        if self.store is not None and self.is_leader:
+            self.store.release_lease("warmer", self.holder)
+            self.is_leader = False
+
+    async def _elect(self):
+        if self.store is None:
+            return True
+        try:
+            leader = await asyncio.to_thread(
+                self.store.try_acquire_lease, "warmer", self.holder, self.lease_ttl
+            )
+        except Exception as e:
+            logger.warning("Не удалось продлить лидерство прогрева: %s", e)
+            leader = False
+        if leader and not self.is_leader:
+            # Новый лидер продолжает расписание с того места, где остановился прежний
+            await self._resume_from_cache()
+        if not leader and self.is_leader:
+            # Лидерство перешло к другому воркеру - не качаем то же самое параллельно с ним
+            logger.warning("Лидерство прогрева потеряно", extra={"holder": self.holder})
+            for task in (self._heavy, *self._light):
+                if task is not None:
+                    task.cancel()
+        self.is_leader = leader
+        return leader
+
+    def _spawn(self, job):
+        # running выставляется сразу, чтобы следующий шаг цикла не запустил задачу повторно
+        job.running = True
+        return asyncio.create_task(self._refresh(job))
+
+    async def _refresh(self, job):
+        job.running = True
+        try:
+            # Загрузка общая с запросами, ждущими этот ключ: отмена прогрева
+            # (потеря лидерства, остановка) не должна отменять её для них
+            await asyncio.shield(self.cache.refresh(job.kind, job.league, self.loaders[job.kind]))
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            # Повторяем раньше обычного интервала, но с нарастающей паузой
+            delay = min(self.intervals[job.kind], self.retry_base * 2 ** (job.failures - 1))
+            job.next_refresh = time.time() + delay
+            logger.warning(
+                "Не удалось обновить снимок: %s", e,
+                extra={"kind": job.kind, "league": job.league, "failures": job.failures},
+            )
+        else:
+            job.failures = 0
+            job.last_error = None
+            job.last_refreshed = time.time()
+            job.next_refresh = job.last_refreshed + self.intervals[job.kind]
+        finally:
+            job.running = False
+
+    async def _resume_from_cache(self):
+        # После рестарта не перекачиваем то, что уже есть в сохранённых снимках
+        for job in self.jobs:
+            entry = await self.cache.peek(job.kind, job.league)
+            if entry is not None:
+                job.last_refreshed = entry.fetched_at
+                job.next_refresh = max(job.next_refresh, entry.fetched_at + self.intervals[job.kind])
+
+    async def _run(self):
+        if self.store is None:
+            await self._resume_from_cache()
+        while True:
+            # Блокировка продлевается на каждом шаге цикла: обновления идут в отдельных
+            # задачах и шаг не ждёт квоту, так что он не дольше 30 сек < lease_ttl
+            if not await self._elect():
+                await asyncio.sleep(min(self.lease_ttl / 3, 30))
+                continue
+
+            now = time.time()
+            due = [job for job in self.jobs if not job.running and job.next_refresh <= now]
+
+            # Лёгкие и важные снимки обновляем сразу и все вместе
+            for job in due:
+                if job.kind in self.light_kinds:
+                    task = self._spawn(job)
+                    self._light.add(task)
+                    task.add_done_callback(self._light.discard)
+
+            # Составы - по одной лиге в фоне, чтобы не задерживать таблицы
+            if self._heavy is None or self._heavy.done():
+                heavy = [job for job in due if job.kind not in self.light_kinds]
+                if heavy:
+                    job = min(heavy, key=lambda j: j.next_refresh)
+                    self._heavy = self._spawn(job)
+
+            pending = [job.next_refresh for job in self.jobs if not job.running]
+            wait = min(pending) - time.time() if pending else 1
+            await asyncio.sleep(min(max(wait, 1), 30))
+
+    def status(self):
+        return {
+            "leader": self.is_leader,
+            "holder": self.holder,
+            "leagues": [job.as_dict() for job in self.jobs],
+        }
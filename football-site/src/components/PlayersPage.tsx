@@ -1,8 +1,18 @@
-import React, { useState, useEffect } from 'react';
-import { Search, User, Shirt, Flag, Goal, Zap, Star, AlertCircle, Eye, Filter } from 'lucide-react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
+import { Search, User, Shirt, Flag, Goal, Zap, Star, AlertCircle } from 'lucide-react';
 import ScrollAnimation from './ScrollAnimation';
-import { usePlayers, useLeagues } from '../hooks/useFootballData';
-import { Player } from '../types/Player';
+import { getLeagues, leagueCode, queryPlayers, PlayersQuery } from '../services/footballApi';
+
+// Игроков на странице выдачи и пауза после ввода перед запросом
+const PAGE_SIZE = 50;
+const SEARCH_DELAY_MS = 300;
+
+const SORT_OPTIONS = [
+  { value: 'name', label: 'По имени' },
+  { value: '-goals', label: 'По голам' },
+  { value: '-assists', label: 'По передачам' },
+  { value: 'age', label: 'По возрасту' },
+];
 
 const PlayersPage: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('');
@@ -22,64 +32,72 @@ const PlayersPage: React.FC = () => {
 
   const isFavorite = (playerId: string) => favoritePlayers.includes(playerId);
 
-  // 🔧 Временно используем прямые вызовы API вместо хуков
-  const [allPlayers, setAllPlayers] = useState<any[]>([]);
-  const [leaguesData, setLeaguesData] = useState<any[]>([]);
+  // 🔎 Игроков фильтрует, сортирует и режет на страницы сервер: грузим одну страницу
+  const [players, setPlayers] = useState<any[]>([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [sort, setSort] = useState('name');
+  const [query, setQuery] = useState('');
+  const [leaguesCount, setLeaguesCount] = useState(0);
   const [playersLoading, setPlayersLoading] = useState(true);
-  const [leaguesLoading, setLeaguesLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [playersError, setPlayersError] = useState<string | null>(null);
-  const [leaguesError, setLeaguesError] = useState<string | null>(null);
-  const [dataLoaded, setDataLoaded] = useState(false);
 
-  // 🔄 Загружаем данные напрямую
   useEffect(() => {
-    if (dataLoaded) return; // Предотвращаем двойную загрузку
-    
-    const loadData = async () => {
-      try {
-        console.log('🔄 Загружаем данные напрямую...');
-        
-        // Импортируем API функции
-        const { getAllPlayers, getLeagues } = await import('../services/footballApi');
-        
-        console.log('📊 Вызываем getAllPlayers...');
-        const players = await getAllPlayers();
-        console.log('✅ Получили игроков:', players.length);
-        console.log('✅ Первые 3 игрока:', players.slice(0, 3));
-        setAllPlayers(players);
-        setPlayersLoading(false);
-        
-        console.log('📊 Вызываем getLeagues...');
-        const leagues = await getLeagues();
-        console.log('✅ Получили лиги:', leagues.length);
-        console.log('✅ Названия лиг:', leagues.map(l => l.name));
-        setLeaguesData(leagues);
-        setLeaguesLoading(false);
-        
-        setDataLoaded(true);
-        
-      } catch (error) {
-        console.error('❌ Ошибка загрузки данных:', error);
-        setPlayersError(error instanceof Error ? error.message : 'Ошибка загрузки');
-        setLeaguesError(error instanceof Error ? error.message : 'Ошибка загрузки');
-        setPlayersLoading(false);
-        setLeaguesLoading(false);
-        setDataLoaded(true);
-      }
-    };
+    getLeagues().then(leagues => setLeaguesCount(leagues.length));
+  }, []);
 
-    loadData();
-  }, [dataLoaded]);
+  // Запрос уходит, когда пользователь перестал печатать, а не на каждую букву
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(searchTerm.trim()), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
-  // 🔍 Отладочная информация
-  console.log('🔍 PlayersPage - allPlayers:', allPlayers.length);
-  console.log('🔍 PlayersPage - allPlayers sample:', allPlayers.slice(0, 3));
-  console.log('🔍 PlayersPage - leaguesData:', leaguesData.length);
-  console.log('🔍 PlayersPage - leaguesData names:', leaguesData.map(l => l.name));
-  console.log('🔍 PlayersPage - loading:', playersLoading);
-  console.log('🔍 PlayersPage - error:', playersError);
-  console.log('🔍 PlayersPage - selectedLeague:', selectedLeague);
-  console.log('🔍 PlayersPage - selectedPosition:', selectedPosition);
+  const baseQuery = useMemo<PlayersQuery>(() => ({
+    league: selectedLeague === 'all' ? undefined : leagueCode(selectedLeague),
+    position: selectedPosition === 'all' ? undefined : selectedPosition,
+    q: query || undefined,
+    sort,
+    limit: PAGE_SIZE,
+  }), [selectedLeague, selectedPosition, query, sort]);
+  // Страница "ещё", пришедшая после смены фильтров, уже не нужна
+  const currentQuery = useRef(baseQuery);
+  currentQuery.current = baseQuery;
+
+  useEffect(() => {
+    let cancelled = false;
+    setPlayersLoading(true);
+    setPlayersError(null);
+    queryPlayers(baseQuery)
+      .then(page => {
+        if (cancelled) return;
+        setPlayers(page.items);
+        setTotal(page.total);
+        setNextCursor(page.nextCursor);
+      })
+      .catch(error => {
+        if (!cancelled) setPlayersError(error instanceof Error ? error.message : 'Ошибка загрузки');
+      })
+      .finally(() => {
+        if (!cancelled) setPlayersLoading(false);
+      });
+    return () => { cancelled = true; };
+  }, [baseQuery]);
+
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await queryPlayers({ ...baseQuery, cursor: nextCursor });
+      if (currentQuery.current !== baseQuery) return;
+      setPlayers(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      setPlayersError(error instanceof Error ? error.message : 'Ошибка загрузки');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   // Позиции на русском языке для отображения
   const positionTranslations = {
@@ -96,24 +114,8 @@ const PlayersPage: React.FC = () => {
   
   // Оставляем только топ-5 европейских лиг
   const availableLeagues = ['all', 'Premier League', 'La Liga', 'Bundesliga', 'Serie A', 'Ligue 1'];
-  const availablePositions = ['all', ...Object.values(positionTranslations)];
-
-  const filteredPlayers = allPlayers.filter(player => {
-    // Проверяем лигу по названию из фиксированного списка
-    const leagueMatch = selectedLeague === 'all' || 
-      player.league === selectedLeague;
-    
-    // Проверяем позицию с учетом переводов
-    const positionMatch = selectedPosition === 'all' || 
-      positionTranslations[player.position as keyof typeof positionTranslations] === selectedPosition;
-    
-    const searchMatch = player.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      player.team.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      player.nationality.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    return leagueMatch && positionMatch && searchMatch;
-  });
-
+  // Фильтр хранит позицию как на сервере, на кнопках - перевод
+  const availablePositions = ['all', ...Object.keys(positionTranslations)];
 
   const getPositionColor = (position: string) => {
     switch (position) {
@@ -136,32 +138,6 @@ const PlayersPage: React.FC = () => {
 
 
 
-  if (playersLoading || leaguesLoading) {
-    return (
-      <div className="players-page">
-        <div className="container">
-          <div className="loading-container">
-            <Star size={48} className="loading-spinner" />
-            <p>Загрузка игроков...</p>
-          </div>
-        </div>
-      </div>
-    );
-  }
-
-  if (playersError || leaguesError) {
-    return (
-      <div className="players-page">
-        <div className="container">
-          <div className="error-message">
-            <AlertCircle size={24} />
-            <p>{playersError || leaguesError}</p>
-          </div>
-        </div>
-      </div>
-    );
-  }
-
   return (
     <div className="players-page">
       <div className="container">
@@ -179,21 +155,21 @@ const PlayersPage: React.FC = () => {
             <div className="stat-item">
               <User size={32} />
               <div>
-                <span className="stat-number">{allPlayers.length}+</span>
-                <span className="stat-label">Всего игроков</span>
+                <span className="stat-number">{players.length}</span>
+                <span className="stat-label">Показано</span>
               </div>
             </div>
             <div className="stat-item">
               <Shirt size={32} />
               <div>
-                <span className="stat-number">{leaguesData.length}</span>
+                <span className="stat-number">{leaguesCount}</span>
                 <span className="stat-label">Лиг</span>
               </div>
             </div>
             <div className="stat-item">
               <Star size={32} />
               <div>
-                <span className="stat-number">{filteredPlayers.length}</span>
+                <span className="stat-number">{total}</span>
                 <span className="stat-label">Найдено</span>
               </div>
             </div>
@@ -227,6 +203,21 @@ const PlayersPage: React.FC = () => {
             </div>
           </div>
 
+          <div className="filter-group">
+            <label>Сортировка:</label>
+            <div className="filter-buttons">
+              {SORT_OPTIONS.map(option => (
+                <button
+                  key={option.value}
+                  onClick={() => setSort(option.value)}
+                  className={`filter-btn ${sort === option.value ? 'active' : ''}`}
+                >
+                  {option.label}
+                </button>
+              ))}
+            </div>
+          </div>
+
           <div className="filter-group">
             <label>Позиция:</label>
             <div className="filter-buttons">
@@ -244,16 +235,29 @@ const PlayersPage: React.FC = () => {
         </div>
 
     <div style={{ padding: '20px' }}>
-      <h2>Игроки Premier League ({filteredPlayers.length})</h2>
-      
-      {filteredPlayers.length > 0 ? (
+      <h2>Игроки ({total})</h2>
+
+      {playersError && (
+        <div className="error-message">
+          <AlertCircle size={24} />
+          <p>{playersError}</p>
+        </div>
+      )}
+
+      {playersLoading ? (
+        <div className="loading-container">
+          <Star size={48} className="loading-spinner" />
+          <p>Загрузка игроков...</p>
+        </div>
+      ) : players.length > 0 ? (
+        <>
         <div style={{ 
           display: 'grid', 
           gridTemplateColumns: 'repeat(auto-fill, minmax(300px, 1fr))', 
           gap: '15px',
           marginTop: '20px'
         }}>
-          {filteredPlayers.map((player, index) => (
+          {players.map((player) => (
             <div 
               key={player.id} 
               style={{
@@ -348,7 +352,7 @@ const PlayersPage: React.FC = () => {
               
               <div style={{ display: 'flex', justifyContent: 'space-between', fontSize: '14px', color: '#6b7280' }}>
                 <span>🏴 {player.nationality}</span>
-                <span>👤 {player.age} лет</span>
+                <span>👤 {player.age ?? '—'} лет</span>
                 <span># {player.shirtNumber || 'N/A'}</span>
               </div>
               
@@ -368,6 +372,14 @@ const PlayersPage: React.FC = () => {
             </div>
           ))}
         </div>
+        {nextCursor && (
+          <div style={{ textAlign: 'center', marginTop: '20px' }}>
+            <button className="filter-btn" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Загрузка...' : `Показать ещё (${players.length} из ${total})`}
+            </button>
+          </div>
+        )}
+        </>
       ) : (
         <div style={{
           textAlign: 'center',
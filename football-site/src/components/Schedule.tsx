@@ -1,102 +1,30 @@
 import React, { useState } from 'react';
 import { Calendar, Clock, MapPin, Users } from 'lucide-react';
+import { useMatches } from '../hooks/useFootballData';
+import { localIsoDate } from '../services/footballApi';
 
-interface Match {
-  id: string;
-  homeTeam: string;
-  awayTeam: string;
-  homeLogo: string;
-  awayLogo: string;
-  date: string;
-  time: string;
-  venue: string;
-  league: string;
-  status: 'upcoming' | 'live' | 'finished';
-  homeScore?: number;
-  awayScore?: number;
-  minute?: number;
-}
+// Дата через offset дней от сегодняшней, YYYY-MM-DD
+const dayFromToday = (offset: number): string => {
+  const date = new Date();
+  date.setDate(date.getDate() + offset);
+  return localIsoDate(date);
+};
 
 const Schedule: React.FC = () => {
   const [selectedDate, setSelectedDate] = useState<string>('today');
   const [selectedLeague, setSelectedLeague] = useState<string>('all');
 
-  const matches: Match[] = [
-    {
-      id: '1',
-      homeTeam: 'Manchester United',
-      awayTeam: 'Liverpool',
-      homeLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Manchester-United-Logo.png',
-      awayLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Liverpool-Logo.png',
-      date: '2024-01-15',
-      time: '17:30',
-      venue: 'Old Trafford',
-      league: 'Premier League',
-      status: 'upcoming'
-    },
-    {
-      id: '2',
-      homeTeam: 'Real Madrid',
-      awayTeam: 'Barcelona',
-      homeLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Real-Madrid-Logo.png',
-      awayLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Barcelona-Logo.png',
-      date: '2024-01-15',
-      time: '21:00',
-      venue: 'Santiago Bernabéu',
-      league: 'La Liga',
-      status: 'live',
-      homeScore: 2,
-      awayScore: 1,
-      minute: 67
-    },
-    {
-      id: '3',
-      homeTeam: 'Bayern Munich',
-      awayTeam: 'Borussia Dortmund',
-      homeLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Bayern-Munich-Logo.png',
-      awayLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Borussia-Dortmund-Logo.png',
-      date: '2024-01-14',
-      time: '18:30',
-      venue: 'Allianz Arena',
-      league: 'Bundesliga',
-      status: 'finished',
-      homeScore: 3,
-      awayScore: 0
-    },
-    {
-      id: '4',
-      homeTeam: 'PSG',
-      awayTeam: 'Marseille',
-      homeLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Paris-Saint-Germain-Logo.png',
-      awayLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Olympique-Marseille-Logo.png',
-      date: '2024-01-16',
-      time: '20:45',
-      venue: 'Parc des Princes',
-      league: 'Ligue 1',
-      status: 'upcoming'
-    },
-    {
-      id: '5',
-      homeTeam: 'Juventus',
-      awayTeam: 'AC Milan',
-      homeLogo: 'https://logos-world.net/wp-content/uploads/2020/06/Juventus-Logo.png',
-      awayLogo: 'https://logos-world.net/wp-content/uploads/2020/06/AC-Milan-Logo.png',
-      date: '2024-01-17',
-      time: '19:00',
-      venue: 'Allianz Stadium',
-      league: 'Serie A',
-      status: 'upcoming'
-    }
-  ];
-
   const leagues = ['all', 'Premier League', 'La Liga', 'Bundesliga', 'Ligue 1', 'Serie A'];
   const dates = [
-    { id: 'yesterday', label: 'Вчера', date: '2024-01-13' },
-    { id: 'today', label: 'Сегодня', date: '2024-01-14' },
-    { id: 'tomorrow', label: 'Завтра', date: '2024-01-15' },
+    { id: 'yesterday', label: 'Вчера', date: dayFromToday(-1) },
+    { id: 'today', label: 'Сегодня', date: dayFromToday(0) },
+    { id: 'tomorrow', label: 'Завтра', date: dayFromToday(1) },
     { id: 'week', label: 'Неделя', date: 'week' }
   ];
 
+  // Одним запросом - всё окно фильтров: со вчера до конца недели
+  const { matches, loading } = useMatches('all', dates[0].date, dayFromToday(7));
+
   const filteredMatches = matches.filter(match => {
     const leagueMatch = selectedLeague === 'all' || match.league === selectedLeague;
     const dateMatch = selectedDate === 'week' || match.date === dates.find(d => d.id === selectedDate)?.date;
@@ -170,7 +98,11 @@ const Schedule: React.FC = () => {
 
         {/* Matches List */}
         <div className="matches-list">
-          {filteredMatches.length > 0 ? (
+          {loading ? (
+            <div className="no-matches">
+              <h3>Загружаем матчи...</h3>
+            </div>
+          ) : filteredMatches.length > 0 ? (
             filteredMatches.map((match) => (
               <div key={match.id} className="match-card">
                 <div className="match-header">
@@ -1,61 +1,32 @@
 import React, { useState } from 'react';
 import { Calendar, Clock, MapPin, Star } from 'lucide-react';
 import ScrollAnimation from './ScrollAnimation';
+import { useMatches } from '../hooks/useFootballData';
+import { localIsoDate, Match } from '../services/footballApi';
 
-interface Match {
-  id: string;
-  homeTeam: string;
-  awayTeam: string;
-  homeLogo: string;
-  awayLogo: string;
-  league: string;
-  date: string;
-  time: string;
-  venue: string;
-  status: 'upcoming' | 'live' | 'finished';
-  homeScore?: number;
-  awayScore?: number;
-  minute?: number;
-}
-
-const matchesData: Match[] = [
-  {
-    id: 'm1', homeTeam: 'Manchester Utd', awayTeam: 'Liverpool', homeLogo: 'https://upload.wikimedia.org/wikipedia/en/7/7a/Manchester_United_FC_crest.svg', awayLogo: 'https://upload.wikimedia.org/wikipedia/en/0/0c/Liverpool_FC.svg', league: 'Premier League', date: '2025-01-15', time: '15:00', venue: 'Old Trafford', status: 'upcoming'
-  },
-  {
-    id: 'm2', homeTeam: 'Real Madrid', awayTeam: 'Barcelona', homeLogo: 'https://upload.wikimedia.org/wikipedia/en/5/56/Real_Madrid_CF.svg', awayLogo: 'https://upload.wikimedia.org/wikipedia/en/4/47/FC_Barcelona_%28crest%29.svg', league: 'La Liga', date: '2025-01-16', time: '20:00', venue: 'Santiago Bernabéu', status: 'upcoming'
-  },
-  {
-    id: 'm3', homeTeam: 'Bayern Munich', awayTeam: 'Borussia Dortmund', homeLogo: 'https://upload.wikimedia.org/wikipedia/commons/0/04/FC_Bayern_Munich_logo_%282017%29.svg', awayLogo: 'https://upload.wikimedia.org/wikipedia/commons/6/67/Borussia_Dortmund_logo.svg', league: 'Bundesliga', date: '2025-01-17', time: '18:30', venue: 'Allianz Arena', status: 'upcoming'
-  },
-  {
-    id: 'm4', homeTeam: 'PSG', awayTeam: 'Marseille', homeLogo: 'https://upload.wikimedia.org/wikipedia/en/thumb/4/47/Paris_Saint-Germain_F.C..svg/1200px-Paris_Saint-Germain_F.C..svg.png', awayLogo: 'https://upload.wikimedia.org/wikipedia/commons/thumb/d/d8/Olympique_Marseille_logo.svg/1200px-Olympique_Marseille_logo.svg.png', league: 'Ligue 1', date: '2025-01-18', time: '21:00', venue: 'Parc des Princes', status: 'upcoming'
-  },
-  {
-    id: 'm5', homeTeam: 'Juventus', awayTeam: 'Inter Milan', homeLogo: 'https://upload.wikimedia.org/wikipedia/commons/thumb/1/1a/Juventus_FC_2017_logo.svg/1200px-Juventus_FC_2017_logo.svg.png', awayLogo: 'https://upload.wikimedia.org/wikipedia/commons/0/05/FC_Internazionale_Milano_2021.svg', league: 'Serie A', date: '2025-01-19', time: '19:45', venue: 'Allianz Stadium', status: 'upcoming'
-  },
-  {
-    id: 'm6', homeTeam: 'Chelsea', awayTeam: 'Arsenal', homeLogo: 'https://upload.wikimedia.org/wikipedia/en/thumb/c/cc/Chelsea_FC.svg/1200px-Chelsea_FC.svg.png', awayLogo: 'https://upload.wikimedia.org/wikipedia/en/5/53/Arsenal_FC.svg', league: 'Premier League', date: '2025-01-20', time: '17:30', venue: 'Stamford Bridge', status: 'upcoming'
-  },
-  {
-    id: 'm7', homeTeam: 'Manchester City', awayTeam: 'Tottenham', homeLogo: 'https://upload.wikimedia.org/wikipedia/en/e/eb/Manchester_City_FC_logo.svg', awayLogo: 'https://upload.wikimedia.org/wikipedia/en/b/b4/Tottenham_Hotspur.svg', league: 'Premier League', date: '2025-01-21', time: '16:00', venue: 'Etihad Stadium', status: 'upcoming'
-  },
-  {
-    id: 'm8', homeTeam: 'Atlético Madrid', awayTeam: 'Sevilla', homeLogo: 'https://upload.wikimedia.org/wikipedia/en/f/f4/Atletico_Madrid_2017_logo.svg', awayLogo: 'https://upload.wikimedia.org/wikipedia/en/thumb/3/3a/Sevilla_FC_logo.svg/1200px-Sevilla_FC_logo.svg.png', league: 'La Liga', date: '2025-01-22', time: '19:00', venue: 'Cívitas Metropolitano', status: 'upcoming'
-  },
-];
+// Сколько дней назад и вперёд показывает страница
+const DAYS_BACK = 7;
+const DAYS_AHEAD = 30;
+
+const dayFromToday = (offset: number): string => {
+  const date = new Date();
+  date.setDate(date.getDate() + offset);
+  return localIsoDate(date);
+};
 
 const SchedulePage: React.FC = () => {
   const [selectedDate, setSelectedDate] = useState<string>('all');
   const [selectedLeague, setSelectedLeague] = useState<string>('all');
+  const [range] = useState(() => ({ from: dayFromToday(-DAYS_BACK), to: dayFromToday(DAYS_AHEAD) }));
+  const { matches, loading } = useMatches('all', range.from, range.to);
 
-  const filteredMatches = matchesData.filter(match => {
+  const filteredMatches = matches.filter(match => {
     const dateMatch = selectedDate === 'all' || match.date === selectedDate;
     const leagueMatch = selectedLeague === 'all' || match.league === selectedLeague;
     return dateMatch && leagueMatch;
   });
 
-  const leagues = ['all', ...Array.from(new Set(matchesData.map(match => match.league)))];
+  const leagues = ['all', ...Array.from(new Set(matches.map(match => match.league || '')))].filter(Boolean);
 
   const getStatusColor = (status: Match['status']) => {
     switch (status) {
@@ -68,7 +39,7 @@ const SchedulePage: React.FC = () => {
 
   const getStatusText = (status: Match['status'], minute?: number) => {
     switch (status) {
-      case 'live': return `LIVE ${minute}'`;
+      case 'live': return minute ? `LIVE ${minute}'` : 'LIVE';
       case 'upcoming': return 'Предстоящий';
       case 'finished': return 'Завершен';
       default: return status;
@@ -108,7 +79,7 @@ const SchedulePage: React.FC = () => {
         {/* Matches List */}
         <div className="schedule-matches">
           {filteredMatches.map((match, index) => (
-            <ScrollAnimation key={match.id} animation="fadeInUp" delay={index * 100}>
+            <ScrollAnimation key={match.id} animation="fadeInUp" delay={Math.min(index, 10) * 100}>
               <div className="match-card">
                 <div className="match-header">
                   <div className="match-league">
@@ -174,7 +145,13 @@ const SchedulePage: React.FC = () => {
           ))}
         </div>
 
-        {filteredMatches.length === 0 && (
+        {loading && (
+          <div className="no-results">
+            <h3>Загружаем матчи...</h3>
+          </div>
+        )}
+
+        {!loading && filteredMatches.length === 0 && (
           <div className="no-results">
             <h3>Матчи не найдены</h3>
             <p>Попробуйте изменить фильтры.</p>
@@ -1,7 +1,32 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { TrendingUp, Users, Trophy, Calendar, Target, Zap } from 'lucide-react';
+import { getLeaderboards, Leaderboards } from '../services/footballApi';
+
+const LEADER_BOARDS = [
+  { field: 'goals', title: 'Бомбардиры', unit: 'гол.', icon: Target },
+  { field: 'assists', title: 'Ассистенты', unit: 'пас.', icon: Zap },
+  { field: 'goalsAssists', title: 'Гол + пас', unit: 'г+п', icon: Trophy },
+] as const;
 
 const Stats: React.FC = () => {
+  // Лидерборды уже отсортированы на сервере - компонент только выводит первые строки
+  const [leaders, setLeaders] = useState<Leaderboards | null>(null);
+  const [leadersError, setLeadersError] = useState<string | null>(null);
+
+  useEffect(() => {
+    let cancelled = false;
+    getLeaderboards(undefined, 5)
+      .then(data => {
+        if (!cancelled) setLeaders(data);
+      })
+      .catch(error => {
+        if (!cancelled) setLeadersError(error instanceof Error ? error.message : 'Ошибка загрузки');
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, []);
+
   const stats = [
     {
       icon: Users,
@@ -126,6 +151,46 @@ const Stats: React.FC = () => {
           </div>
         </div>
 
+        {/* Leaderboards */}
+        <div className="achievements">
+          <div className="section-title">
+            <h3>
+              <span className="gradient-text">Лидеры сезона</span>
+            </h3>
+          </div>
+
+          {leadersError && <div className="error-message">{leadersError}</div>}
+          {!leaders && !leadersError && <div className="stat-card-description">Загрузка...</div>}
+          {leaders && (
+            <div className="achievements-grid">
+              {LEADER_BOARDS.map((board) => (
+                <div key={board.field} className="achievement-card">
+                  <div className="achievement-icon">
+                    <board.icon size={24} color="var(--football-green)" />
+                  </div>
+                  <div className="achievement-title">{board.title}</div>
+                  {leaders[board.field].map((player) => (
+                    <div key={player.id} className="achievement-description">
+                      {player.name} ({player.team}) — <span className="achievement-year">{player[board.field]} {board.unit}</span>
+                    </div>
+                  ))}
+                </div>
+              ))}
+              <div className="achievement-card">
+                <div className="achievement-icon">
+                  <Users size={24} color="var(--football-green)" />
+                </div>
+                <div className="achievement-title">Команды</div>
+                {leaders.teams.slice(0, 5).map((team) => (
+                  <div key={team.teamId} className="achievement-description">
+                    {team.team}{team.topScorer ? ` (${team.topScorer})` : ''} — <span className="achievement-year">{team.goalsAssists} г+п</span>
+                  </div>
+                ))}
+              </div>
+            </div>
+          )}
+        </div>
+
         {/* Live Stats */}
         <div className="live-stats">
           <div className="live-stats-title">Текущий сезон</div>
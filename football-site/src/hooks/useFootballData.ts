@@ -10,6 +10,7 @@ import {
   getAllPlayers,
   getMatchesByLeague,
   League,
+  Match,
   Team,
   Player
 } from '../services/footballApi';
@@ -114,8 +115,8 @@ export const usePlayers = (teamId?: string) => {
 };
 
 // 📅 Хук для загрузки матчей
-export const useMatches = (leagueId?: string) => {
-  const [matches, setMatches] = useState<any[]>([]);
+export const useMatches = (leagueId?: string, from?: string, to?: string) => {
+  const [matches, setMatches] = useState<Match[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -126,7 +127,7 @@ export const useMatches = (leagueId?: string) => {
         setError(null);
         console.log(`🔄 Загружаем матчи${leagueId ? ` для лиги ${leagueId}` : ''}...`);
         
-        const data = await getMatchesByLeague(leagueId || 'all');
+        const data = await getMatchesByLeague(leagueId || 'all', { from, to });
         setMatches(data);
         console.log('✅ Матчи загружены:', data.length);
       } catch (err) {
@@ -138,7 +139,7 @@ export const useMatches = (leagueId?: string) => {
     };
 
     fetchMatches();
-  }, [leagueId]);
+  }, [leagueId, from, to]);
 
   return { matches, loading, error };
 };
@@ -74,6 +74,7 @@ export interface Match {
   league?: string;
   homeScore?: number;
   awayScore?: number;
+  minute?: number;
 }
 
 // 🔧 Вспомогательные функции
@@ -81,6 +82,37 @@ const handleApiError = (error: any) => {
   console.error('❌ API Error:', error);
 };
 
+// Сервер отдаёт код лиги, на странице - её название
+const LEAGUE_NAMES: Record<string, string> = {
+  PL: 'Premier League',
+  PD: 'La Liga',
+  BL1: 'Bundesliga',
+  SA: 'Serie A',
+  FL1: 'Ligue 1',
+};
+
+// Название лиги -> код для запросов к серверу ("La Liga" -> "PD")
+export const leagueCode = (name: string): string | undefined =>
+  Object.keys(LEAGUE_NAMES).find(code => LEAGUE_NAMES[code] === name);
+
+// Игрок со статистикой с сервера -> формат, ожидаемый фронтендом
+const toPlayer = (player: any) => ({
+  id: player.id.toString(),
+  name: player.name,
+  position: player.position || 'Unknown',
+  nationality: player.nationality || 'Unknown',
+  team: player.team,
+  age: player.age ?? undefined,
+  goals: player.goals,
+  assists: player.assists,
+  matches: player.playedMatches ?? 0, // Известно только для игроков из списка бомбардиров
+  rating: "7.5", // Базовый рейтинг
+  photo: `https://ui-avatars.com/api/?name=${encodeURIComponent(player.name)}&size=150&background=cccccc&color=666666`,
+  shirtNumber: player.shirtNumber,
+  league: LEAGUE_NAMES[player.league] || player.league,
+  overall: 75 // Базовый рейтинг
+});
+
 // 📊 Загрузка данных из Python API
 const loadPythonData = async (leagueId?: string) => {
   try {
@@ -219,7 +251,7 @@ export const getAllPlayers = async (): Promise<Player[]> => {
   try {
     console.log('🔄 Загружаем всех игроков Premier League...');
     
-    const response = await fetch('http://localhost:8000/players/premier-league');
+    const response = await fetch('http://localhost:8000/players/premier-league/stats');
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
@@ -228,23 +260,8 @@ export const getAllPlayers = async (): Promise<Player[]> => {
     console.log('🔍 Total players:', data.players?.length || 0);
     console.log('🔍 First 3 players:', data.players?.slice(0, 3));
     
-        // Преобразуем реальные данные в формат, ожидаемый фронтендом
-        const players = data.players?.map((player: any) => ({
-          id: player.id.toString(),
-          name: player.name,
-          position: player.position || 'Unknown',
-          nationality: player.nationality || 'Unknown',
-          team: player.team,
-          age: player.age || 25,
-          goals: 0, // Статистика не доступна в базовом API
-          assists: 0, // Статистика не доступна в базовом API
-          matches: 0, // Статистика не доступна в базовом API
-          rating: "7.5", // Базовый рейтинг
-          photo: `https://ui-avatars.com/api/?name=${encodeURIComponent(player.name)}&size=150&background=cccccc&color=666666`,
-          shirtNumber: player.shirtNumber,
-          league: 'Premier League',
-          overall: 75 // Базовый рейтинг
-        })) || [];
+    // Преобразуем реальные данные в формат, ожидаемый фронтендом
+    const players = data.players?.map(toPlayer) || [];
     
     console.log(`✅ Загружено игроков: ${players.length}`);
     return players;
@@ -254,6 +271,71 @@ export const getAllPlayers = async (): Promise<Player[]> => {
   }
 };
 
+// 🏆 Лидерборды: голы, передачи, гол+пас и суммы по командам
+export interface Leaderboards {
+  goals: any[];
+  assists: any[];
+  goalsAssists: any[];
+  teams: any[];
+  errors?: Record<string, string>;
+}
+
+export const getLeaderboards = async (
+  leagueId?: string,
+  limit = 10,
+  teamId?: number,
+): Promise<Leaderboards> => {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (leagueId && leagueId !== 'all') {
+    params.append('league', leagueId);
+  }
+  if (teamId !== undefined) {
+    params.append('teamId', String(teamId));
+  }
+  const response = await fetch(`http://localhost:8000/leaderboards?${params.toString()}`);
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  return response.json();
+};
+
+// 🔎 Поиск игроков на сервере: фильтры, сортировка и постраничная выдача
+export interface PlayersQuery {
+  league?: string;
+  team?: string;
+  position?: string;
+  nationality?: string;
+  ageMin?: number;
+  ageMax?: number;
+  q?: string;
+  sort?: string;
+  cursor?: string;
+  limit?: number;
+}
+
+export interface PlayersPage {
+  total: number;
+  items: Player[];
+  nextCursor: string | null;
+  errors?: Record<string, string>;
+}
+
+export const queryPlayers = async (query: PlayersQuery): Promise<PlayersPage> => {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      params.append(key, String(value));
+    }
+  });
+
+  const response = await fetch(`http://localhost:8000/players?${params.toString()}`);
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  const page = await response.json();
+  return { ...page, items: page.items.map(toPlayer) };
+};
+
 // ⚽ Получение игроков команды
 export const getPlayersByTeam = async (teamId: string): Promise<Player[]> => {
   try {
@@ -294,17 +376,76 @@ export const getAllTeams = async (): Promise<Team[]> => {
 
 
 // ⚽ Получение матчей лиги
-export const getMatchesByLeague = async (leagueId: string): Promise<Match[]> => {
+const MATCH_STATUSES: Record<string, string> = {
+  SCHEDULED: 'upcoming',
+  TIMED: 'upcoming',
+  IN_PLAY: 'live',
+  PAUSED: 'live',
+  FINISHED: 'finished',
+};
+
+// Больше сервер за один запрос не отдаёт (limit <= 5000)
+const MATCHES_LIMIT = 5000;
+
+// Дата в формате YYYY-MM-DD по местному времени
+export const localIsoDate = (date: Date): string => {
+  const pad = (value: number) => String(value).padStart(2, '0');
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}`;
+};
+
+export interface MatchesRange {
+  from?: string;
+  to?: string;
+}
+
+export const getMatchesByLeague = async (leagueId: string, range: MatchesRange = {}): Promise<Match[]> => {
   try {
     console.log(`🔄 Загружаем матчи лиги: ${leagueId}`);
-    
-    const pythonData = await loadPythonData();
-    if (pythonData && pythonData.matches) {
-      const leagueMatches = pythonData.matches.filter((match: Match) => match.league === leagueId);
-      return leagueMatches;
+
+    const params = new URLSearchParams({ limit: String(MATCHES_LIMIT) });
+    if (leagueId && leagueId !== 'all') {
+      params.append('league', leagueId);
     }
-    
-    return [];
+    // Сервер фильтрует по дате UTC - окно расширяем на день с каждой стороны,
+    // точный отбор по местной дате делает страница
+    if (range.from) {
+      const from = new Date(`${range.from}T00:00:00`);
+      from.setDate(from.getDate() - 1);
+      params.append('from', localIsoDate(from));
+    }
+    if (range.to) {
+      const to = new Date(`${range.to}T00:00:00`);
+      to.setDate(to.getDate() + 1);
+      params.append('to', localIsoDate(to));
+    }
+    const response = await fetch(`http://localhost:8000/matches?${params.toString()}`);
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    if (data.total > data.matches.length) {
+      console.warn(`⚠️ Получено ${data.matches.length} из ${data.total} матчей - сузьте диапазон дат`);
+    }
+
+    return data.matches.map((match: any) => {
+      const kickoff = new Date(match.utcDate);
+      return {
+        id: String(match.id),
+        homeTeam: match.homeTeam.name,
+        awayTeam: match.awayTeam.name,
+        homeLogo: match.homeTeam.crest,
+        awayLogo: match.awayTeam.crest,
+        date: localIsoDate(kickoff),
+        time: kickoff.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+        venue: match.venue || '',
+        status: MATCH_STATUSES[match.status] || match.status.toLowerCase(),
+        league: LEAGUE_NAMES[match.league] || match.league,
+        homeScore: match.homeScore ?? undefined,
+        awayScore: match.awayScore ?? undefined,
+      };
+    }).filter((match: Match) =>
+      (!range.from || match.date >= range.from) && (!range.to || match.date <= range.to)
+    );
   } catch (error) {
     handleApiError(error);
     return [];
@@ -323,11 +464,8 @@ export const search = async (term: string) => {
           team.name.toLowerCase().includes(term.toLowerCase()) ||
           team.country.toLowerCase().includes(term.toLowerCase())
         ) || [],
-        players: pythonData.players?.filter((player: Player) => 
-          player.name.toLowerCase().includes(term.toLowerCase()) ||
-          player.team.toLowerCase().includes(term.toLowerCase()) ||
-          player.nationality.toLowerCase().includes(term.toLowerCase())
-        ) || [],
+        // Игроков ищет сервер по индексу: имя, команда или гражданство
+        players: (await queryPlayers({ q: term, limit: 20 }).catch(() => null))?.items || [],
         leagues: pythonData.leagues?.filter((league: League) => 
           league.name.toLowerCase().includes(term.toLowerCase()) ||
           league.country.toLowerCase().includes(term.toLowerCase())